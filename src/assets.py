@@ -0,0 +1,93 @@
+import os
+import json
+import hashlib
+import logging
+from sync import is_unchanged, place_file
+
+# Written into the output directory: original path -> fingerprinted path
+ASSET_MANIFEST = "asset-manifest.json"
+# Hex digits of the content hash put into fingerprinted file names
+FINGERPRINT_LENGTH = 12
+
+
+def fingerprinted_path(relative_path: str, digest: str) -> str:
+    """
+    Inserts the start of a content hash before the extension: index.css -> index.1a2b3c4d5e6f.css.
+    """
+    root, extension = os.path.splitext(relative_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+
+class AssetTable:
+    """
+    Fingerprinted name of every static file, keyed by content hash so a URL only changes when
+    the file does and the CDN can cache it forever. `urls` is the lookup table of root-relative
+    URLs ("/index.css" -> "/index.1a2b3c4d5e6f.css") the basepath rewrite swaps URLs through.
+    """
+    def __init__(self, files=None):
+        # Path relative to the static directory -> fingerprinted relative path
+        self.files = files if files is not None else {}
+        # Source file -> size and mtime
+        self.signatures = {}
+        self.urls = {
+            "/" + relative_path.replace(os.sep, "/"): "/" + fingerprinted.replace(os.sep, "/")
+            for relative_path, fingerprinted in self.files.items()
+        }
+        # Changes with any fingerprint, so compiled templates are keyed by it
+        self.version = hashlib.blake2b(json.dumps(self.files, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+        # The asset manifest once it is written; pages depend on it
+        self.path = None
+
+    @classmethod
+    def scan(cls, index, hashes):
+        """
+        Fingerprints every file in a source index of the static directory. Each file is hashed
+        at most once per build, and not at all while the hash cache has it at the same size and mtime.
+        """
+        files = {}
+        signatures = {}
+        for relative_path, size, mtime_ns in index.files:
+            path = index.path(relative_path)
+            if not index.fresh:
+                # A reused index may have an outdated size and mtime for a file edited in place
+                stat = os.stat(path)
+                size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            files[relative_path] = fingerprinted_path(relative_path, hashes.digest(path, size, mtime_ns))
+            signatures[path] = {"size": size, "mtime_ns": mtime_ns}
+        table = cls(files)
+        table.signatures = signatures
+        logging.info(f"Assets: {len(files)} fingerprinted, {hashes.hashed} hashed")
+        return table
+
+    def place(self, src_dir: str, output_dir: str, link_mode: str = "copy", writer=None, manifest=None) -> int:
+        """
+        Puts a fingerprinted copy of every static file into the output directory, next to the
+        original. Returns the number of files copied.
+        """
+        copied = 0
+        for relative_path, fingerprinted in self.files.items():
+            src_file = os.path.join(src_dir, relative_path)
+            dest_file = os.path.normpath(os.path.join(output_dir, fingerprinted))
+            signature = self.signatures.get(src_file)
+            if not is_unchanged(src_file, dest_file, src_signature=signature):
+                os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+                place_file(src_file, dest_file, link_mode)
+                copied += 1
+            if manifest is not None:
+                manifest.record(dest_file, [src_file], {src_file: signature} if signature is not None else None)
+            if writer is not None:
+                writer.keep(dest_file)
+                writer.compress(dest_file)
+        return copied
+
+    def save_manifest(self, output_dir: str, writer, manifest=None) -> str:
+        """
+        Writes the asset manifest (original path -> fingerprinted path, with "/" separators)
+        into the output directory and returns its path.
+        """
+        self.path = os.path.join(output_dir, ASSET_MANIFEST)
+        files = {relative_path.replace(os.sep, "/"): fingerprinted.replace(os.sep, "/") for relative_path, fingerprinted in self.files.items()}
+        writer.write(self.path, json.dumps(files, indent=1, sort_keys=True))
+        if manifest is not None:
+            manifest.record(self.path, [])
+        return self.path
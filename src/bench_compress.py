@@ -0,0 +1,53 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import main
+from compress import *
+from output import OutputWriter
+from corpus import generate_corpus
+
+
+def compress_outputs(paths: list, formats, workers: int, cache_path=None) -> tuple:
+    """
+    Compresses the given files through a compressor and returns (seconds, compressor).
+    """
+    started = time.perf_counter()
+    compressor = Compressor(formats, cache_path, workers)
+    writer = OutputWriter(compressor)
+    for path in paths:
+        writer.compress(path)
+    compressor.close()
+    return time.perf_counter() - started, compressor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure precompression throughput and size savings.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="compression threads")
+    parser.add_argument("--formats", choices=COMPRESSION_FORMATS, nargs="+", default=["gzip"] + (["br"] if brotli is not None else []))
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        paths = generate_corpus(root, args.pages)
+        dest = os.path.join(root, "docs")
+        main.generate_pages_recursive(paths["content"], paths["template"], dest, "/")
+        outputs = [dest for _, dest in main.collect_pages(paths["content"], dest)]
+
+        for workers in sorted({1, args.workers}):
+            cache_path = os.path.join(root, f"compress-{workers}.json")
+            seconds, compressor = compress_outputs(outputs, args.formats, workers, cache_path)
+            megabytes = compressor.sizes["input"] / 1e6
+            print(f"{workers:>2} threads: {len(outputs)} pages, {megabytes:.1f} MB in {seconds:.2f} s, {megabytes / seconds:.1f} MB/s")
+            for fmt in args.formats:
+                saved = 1 - compressor.sizes[fmt] / compressor.sizes["input"]
+                print(f"{'':>12}{fmt}: {compressor.sizes[fmt] / 1e6:.1f} MB, {saved:.0%} smaller")
+            seconds, _ = compress_outputs(outputs, args.formats, workers, cache_path)
+            print(f"{'':>12}unchanged rerun: {seconds * 1000:.0f} ms")
+            for path in outputs:
+                for sibling in compressor.siblings(path):
+                    os.remove(sibling)
+    finally:
+        shutil.rmtree(root)
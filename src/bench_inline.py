@@ -0,0 +1,70 @@
+import argparse
+import random
+import timeit
+from inline import *
+
+
+def chained_text_to_textnodes(text):
+    """
+    The original five-pass inline pipeline, kept here as the benchmark baseline.
+    """
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_image(nodes)
+    return split_nodes_link(nodes)
+
+
+def link_heavy_paragraph(spans: int, seed: int = 0) -> str:
+    """
+    Builds a deterministic paragraph of prose mixed with links, images and inline markup.
+    """
+    rng = random.Random(seed)
+    parts = []
+    for i in range(spans):
+        choice = rng.random()
+        if choice < 0.5:
+            parts.append(f"[link {i}](/pages/{i})")
+        elif choice < 0.6:
+            parts.append(f"![image {i}](/images/{i}.png)")
+        elif choice < 0.7:
+            parts.append(f"**bold {i}**")
+        elif choice < 0.8:
+            parts.append(f"`code {i}`")
+        elif choice < 0.9:
+            parts.append(f"_italic {i}_")
+        parts.append("some plain words in between")
+    return " ".join(parts)
+
+
+def links_only_paragraph(links: int) -> str:
+    """
+    Builds one long paragraph with many links and no delimiters, the worst case for the split passes.
+    """
+    return " ".join(f"see [link {i}](/pages/{i}) and more prose" for i in range(links))
+
+
+def prose_paragraph(sentences: int, seed: int = 0) -> str:
+    """
+    Builds plain prose with no inline markup at all, the most common paragraph in real content.
+    """
+    rng = random.Random(seed)
+    words = ("the", "road", "goes", "ever", "on", "and", "down", "from", "door", "where", "it", "began")
+    return " ".join(" ".join(rng.choice(words) for _ in range(12)).capitalize() + "." for _ in range(sentences))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare scan_inline against the chained split passes.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workloads = [(f"prose {n}", prose_paragraph(n)) for n in (1, 10, 100)]
+    workloads += [(f"mixed {n}", link_heavy_paragraph(n)) for n in (100, 1000, 10000)]
+    workloads += [(f"links {n}", links_only_paragraph(n)) for n in (100, 1000, 10000)]
+    for name, text in workloads:
+        assert scan_inline(text) == chained_text_to_textnodes(text)
+        chained = min(timeit.repeat(lambda: chained_text_to_textnodes(text), number=1, repeat=args.repeat))
+        scanned = min(timeit.repeat(lambda: scan_inline(text), number=1, repeat=args.repeat))
+        print(f"{name:>12} {len(text):>8} chars  chained {chained * 1e6:10.1f} us  "
+              f"single pass {scanned * 1e6:10.1f} us  speedup {chained / scanned:5.1f}x")
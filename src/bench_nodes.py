@@ -0,0 +1,65 @@
+import argparse
+import timeit
+import tracemalloc
+from blocks import *
+
+
+class DictTextNode:
+    """
+    TextNode as it was before __slots__, for the memory comparison.
+    """
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    """
+    LeafNode as it was before __slots__, for the memory comparison.
+    """
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def bytes_per_node(factory, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # Exclude the list holding the nodes
+    return (allocated - nodes.__sizeof__()) / count
+
+
+def leaf_node_children(text):
+    """
+    The previous text_to_children: one LeafNode (and props dict for links) per text node.
+    """
+    return [text_node.text_node_to_html_node() for text_node in text_to_textnodes(text)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure node memory and the direct TextNode render path.")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    # The strings are shared so only the node objects themselves are counted
+    text = "some text"
+    rows = [
+        ("TextNode", lambda i: DictTextNode(text, TextType.TEXT), lambda i: TextNode(text, TextType.TEXT)),
+        ("LeafNode", lambda i: DictLeafNode("b", text), lambda i: LeafNode("b", text)),
+        ("link LeafNode vs TextNode", lambda i: DictLeafNode("a", text, {"href": text}), lambda i: TextNode(text, TextType.LINK, text)),
+    ]
+    for name, before, after in rows:
+        print(f"{name:>26}: {bytes_per_node(before, args.count):6.1f} -> {bytes_per_node(after, args.count):6.1f} bytes per node")
+
+    paragraph = " ".join(f"word **bold {i}** and [link {i}](/pages/{i})" for i in range(2000))
+    assert ParentNode("p", leaf_node_children(paragraph)).to_html() == ParentNode("p", text_to_children(paragraph)).to_html()
+    via_leaf = min(timeit.repeat(lambda: ParentNode("p", leaf_node_children(paragraph)).to_html(), number=5, repeat=5))
+    direct = min(timeit.repeat(lambda: ParentNode("p", text_to_children(paragraph)).to_html(), number=5, repeat=5))
+    print(f"paragraph render: via LeafNode {via_leaf * 200:.2f} ms, direct from TextNode {direct * 200:.2f} ms")
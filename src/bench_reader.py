@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from blocks import *
+from reader import open_source
+from corpus import generate_markdown
+
+
+def write_large_markdown(path: str, megabytes: int, seed: int):
+    """
+    Writes a markdown file of about the given size: one title, then generated pages' blocks
+    repeated. The title is on the first line, as on most pages.
+    """
+    rng = random.Random(seed)
+    body = generate_markdown(rng, 2000).split("\n", 1)[1]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Reference\n")
+        for _ in range(megabytes * 1024 * 1024 // len(body.encode("utf-8")) + 1):
+            f.write(body)
+
+
+def read_whole(path: str, render: bool) -> int:
+    # How generate_page read pages originally: the whole file as one str, split once for the
+    # title and again for the blocks
+    with open(path, "r", encoding="utf-8") as md_file:
+        markdown = md_file.read()
+    extract_title(markdown)
+    if render:
+        return sum(len(block.to_html_node().to_html()) for block in markdown_to_typed_blocks(markdown))
+    return len(markdown_to_blocks(markdown))
+
+
+def read_stream(path: str, render: bool) -> int:
+    # Lazily through a text file: scan for the title, seek back and scan again for the blocks
+    with open(path, "r", encoding="utf-8") as md_file:
+        extract_title_from_lines(md_file)
+        md_file.seek(0)
+        return consume(md_file, render)
+
+
+def read_mapped(path: str, render: bool) -> int:
+    # Through a memory map, with the title and the blocks taken from the same scan
+    with open_source(path, mmap_threshold=0) as md_file:
+        _, lines = split_title(md_file)
+        return consume(lines, render)
+
+
+def consume(lines, render: bool) -> int:
+    if render:
+        return sum(len(html) for html in iter_html_blocks(lines))
+    return sum(1 for _ in iter_typed_blocks(lines))
+
+
+READERS = {"read": read_whole, "stream": read_stream, "mmap": read_mapped}
+
+
+def measure(reader: str, path: str, render: bool) -> dict:
+    """
+    Runs one reader in a fresh process, so its peak RSS is its own.
+    """
+    command = [sys.executable, __file__, "--measure", reader, "--path", path] + (["--render"] if render else [])
+    return json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure time and peak RSS of reading a large markdown file.")
+    parser.add_argument("--megabytes", type=int, default=500, help="size of the generated markdown file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--render", action="store_true", help="also render every block to HTML")
+    parser.add_argument("--readers", choices=READERS, nargs="+", default=list(READERS))
+    parser.add_argument("--measure", choices=READERS, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        started = time.perf_counter()
+        result = READERS[args.measure](args.path, args.render)
+        seconds = time.perf_counter() - started
+        # ru_maxrss is in kilobytes on Linux
+        print(json.dumps({"seconds": seconds, "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "result": result}))
+        sys.exit(0)
+
+    root = tempfile.mkdtemp()
+    try:
+        path = os.path.join(root, "reference.md")
+        write_large_markdown(path, args.megabytes, args.seed)
+        print(f"{os.path.getsize(path) / 1e6:.0f} MB markdown" + (", rendered" if args.render else ", split into blocks"))
+        results = {}
+        for reader in args.readers:
+            results[reader] = measure(reader, path, args.render)
+            print(f"{reader:>8}: {results[reader]['seconds']:7.2f} s, peak RSS {results[reader]['max_rss_mb']:8.1f} MB")
+        if len({result["result"] for result in results.values()}) > 1:
+            print("readers disagree: " + ", ".join(f"{reader} {result['result']}" for reader, result in results.items()))
+            sys.exit(1)
+    finally:
+        shutil.rmtree(root)
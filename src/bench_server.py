@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import urllib.request
+from server import *
+from corpus import generate_corpus
+from watcher import watch_tree
+
+
+def measure_latency(site: SiteCache, port: int, md_path: str, url: str, marker: str) -> float:
+    """
+    Edits a page and returns the seconds until the server responds with the new content.
+    """
+    started = time.perf_counter()
+    with open(md_path, "a", encoding="utf-8") as f:
+        f.write(f"\n{marker}\n")
+    while True:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{url}") as response:
+            if marker in response.read().decode("utf-8"):
+                return time.perf_counter() - started
+        time.sleep(0.005)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure dev server edit-to-served latency.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--poll", action="store_true", help="scan the content directory every interval instead of using inotify")
+    parser.add_argument("--budget", type=float, default=100, help="median edit-to-served milliseconds to stay under")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        paths = generate_corpus(root, args.pages, blocks=10)
+        site = SiteCache(paths["content"], paths["template"])
+        watcher = watch_tree(paths["content"]) if not args.poll else None
+        started = time.perf_counter()
+        site.refresh()
+        print(f"initial render of {args.pages} pages: {(time.perf_counter() - started) * 1000:.0f} ms")
+        started = time.perf_counter()
+        site.refresh()
+        print(f"full scan: {(time.perf_counter() - started) * 1000:.1f} ms")
+        started = time.perf_counter()
+        site.refresh(set())
+        print(f"idle watched poll: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        stop = threading.Event()
+        threading.Thread(target=watch, args=(site, args.interval, stop, watcher), daemon=True).start()
+        server = make_server(site, paths["static"], 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        md_path = os.path.join(paths["content"], "d0", "d0", "d0", "page0", "index.md")
+        latencies = sorted(
+            measure_latency(site, server.server_address[1], md_path, "/d0/d0/d0/page0/", f"edit{i}")
+            for i in range(args.edits)
+        )
+        median = latencies[len(latencies) // 2] * 1000
+        print(f"edit-to-served over {args.edits} edits ({'inotify' if watcher is not None else 'polling'}, interval {args.interval * 1000:.0f} ms): "
+              f"median {median:.1f} ms, max {latencies[-1] * 1000:.1f} ms, budget {args.budget:.0f} ms")
+        stop.set()
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(root)
+    if median > args.budget:
+        print(f"FAILED: median edit-to-served {median:.1f} ms is over the {args.budget:.0f} ms budget")
+        sys.exit(1)
@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import random
+import shutil
+import timeit
+import argparse
+import tempfile
+import platform
+import statistics
+import logging
+from blocks import *
+from template import Template
+from corpus import generate_corpus, generate_markdown, generate_block, TEMPLATE
+import main
+from linkcheck import LinkIndex
+from discovery import SourceIndex
+from buildlog import setup_logging, stop_logging
+
+
+def best_of(func, number: int, repeat: int) -> float:
+    """
+    Returns the best time per call in seconds over `repeat` runs of `number` calls.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def micro_benchmarks(repeat: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    markdown = generate_markdown(rng, 400)
+    blocks = markdown_to_blocks(markdown)
+    paragraph = generate_block(rng, "paragraph", inline=0.5)
+    prose = generate_block(rng, "paragraph", inline=0)
+    long_list = "\n".join(generate_block(rng, "unordered_list") for _ in range(50))
+    # Block-heavy documents made of long lists and quotes, where splitting and classification dominate
+    list_markdown = "\n\n".join("\n".join(generate_block(rng, "unordered_list", inline=0) for _ in range(20)) for _ in range(20))
+    quote_markdown = "\n\n".join("\n".join(generate_block(rng, "quote", inline=0) for _ in range(20)) for _ in range(20))
+    tree = markdown_to_html_node(markdown)
+    content = tree.to_html()
+    template = Template(TEMPLATE, "/base/")
+
+    cases = {
+        "text_to_textnodes": (lambda: text_to_textnodes(paragraph), 2000),
+        "text_to_textnodes_prose": (lambda: text_to_textnodes(prose), 20000),
+        "markdown_to_blocks": (lambda: markdown_to_blocks(markdown), 50),
+        "block_to_block_type": (lambda: [block_to_block_type(block) for block in blocks], 50),
+        "block_to_block_type_long_list": (lambda: block_to_block_type(long_list), 500),
+        "split_then_classify": (lambda: [block_to_block_type(block) for block in markdown_to_blocks(markdown)], 50),
+        "markdown_to_typed_blocks": (lambda: markdown_to_typed_blocks(markdown), 50),
+        "split_then_classify_lists": (lambda: [block_to_block_type(block) for block in markdown_to_blocks(list_markdown)], 50),
+        "typed_blocks_lists": (lambda: markdown_to_typed_blocks(list_markdown), 50),
+        "split_then_classify_quotes": (lambda: [block_to_block_type(block) for block in markdown_to_blocks(quote_markdown)], 50),
+        "typed_blocks_quotes": (lambda: markdown_to_typed_blocks(quote_markdown), 50),
+        # Converting as well: typed blocks hand their lines to the conversion instead of it splitting the block again
+        "split_classify_convert_lists": (lambda: [block_to_html_node(block, block_to_block_type(block)).to_html() for block in markdown_to_blocks(list_markdown)], 10),
+        "typed_blocks_convert_lists": (lambda: [block.to_html_node().to_html() for block in markdown_to_typed_blocks(list_markdown)], 10),
+        "split_classify_convert_quotes": (lambda: [block_to_html_node(block, block_to_block_type(block)).to_html() for block in markdown_to_blocks(quote_markdown)], 50),
+        "typed_blocks_convert_quotes": (lambda: [block.to_html_node().to_html() for block in markdown_to_typed_blocks(quote_markdown)], 50),
+        "markdown_to_html_node": (lambda: markdown_to_html_node(markdown), 10),
+        "markdown_to_html_node_lists": (lambda: markdown_to_html_node(list_markdown), 10),
+        "to_html": (lambda: tree.to_html(), 50),
+        "template_fill": (lambda: template.render({"Title": "Title", "Content": content}), 200),
+    }
+    return {name: best_of(func, number, repeat) for name, (func, number) in cases.items()}
+
+
+def end_to_end_benchmark(pages: int, repeat: int, seed: int, jobs: int = 1, pipeline: bool = False, check_links: bool = False) -> float:
+    """
+    Times generate_pages_recursive over a freshly generated corpus, optionally collecting
+    the link index and checking it against the generated pages. The content directory is
+    scanned once up front, as build() does before rendering and checking.
+    """
+    root = tempfile.mkdtemp()
+    try:
+        paths = generate_corpus(root, pages, seed=seed)
+        dest = os.path.join(root, "docs")
+        index = SourceIndex.scan(paths["content"])
+        times = []
+
+        def build():
+            links = LinkIndex() if check_links else None
+            main.generate_pages_recursive(paths["content"], paths["template"], dest, "/", jobs=jobs, pipeline=pipeline, index=index, links=links)
+            if links is not None:
+                links.check(dest, [page for _, page in main.collect_pages(paths["content"], dest, index)], [])
+
+        for _ in range(repeat):
+            shutil.rmtree(dest, ignore_errors=True)
+            times.append(best_of(build, 1, 1))
+        return min(times)
+    finally:
+        shutil.rmtree(root)
+
+
+def link_overhead_benchmark(pages: int, repeat: int, seed: int) -> dict:
+    """
+    Measures what link checking adds to a build: rendering while collecting the links against
+    rendering without, and the check itself. Plain and collecting builds alternate over the
+    same corpus so drift on the machine hits both alike; each is the median of its runs.
+    Returns the two overheads as fractions of the plain build.
+    """
+    root = tempfile.mkdtemp()
+    try:
+        paths = generate_corpus(root, pages, seed=seed)
+        dest = os.path.join(root, "docs")
+        index = SourceIndex.scan(paths["content"])
+        times = {"plain": [], "collect": [], "check": []}
+        for _ in range(repeat):
+            for mode in ("plain", "collect"):
+                shutil.rmtree(dest, ignore_errors=True)
+                links = LinkIndex() if mode == "collect" else None
+                times[mode].append(best_of(lambda: main.generate_pages_recursive(paths["content"], paths["template"], dest, "/", index=index, links=links), 1, 1))
+            outputs = [page for _, page in main.collect_pages(paths["content"], dest, index)]
+            times["check"].append(best_of(lambda: links.check(dest, outputs, []), 1, 1))
+        plain, collect, check = (statistics.median(times[mode]) for mode in ("plain", "collect", "check"))
+        return {"collect": collect / plain - 1, "check": check / plain}
+    finally:
+        shutil.rmtree(root)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Prints each benchmark against the baseline and returns the names that regressed by more than threshold.
+    """
+    regressions = []
+    for name, seconds in results["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            print(f"{name:>32} {seconds * 1000:10.3f} ms   (no baseline)")
+            continue
+        ratio = seconds / before
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:>32} {seconds * 1000:10.3f} ms   baseline {before * 1000:10.3f} ms   {ratio:5.2f}x{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the build pipeline.")
+    parser.add_argument("--pages", type=int, default=500, help="pages in the end-to-end corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for the end-to-end build")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a JSON file from a previous --output run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    # Builds log through the same queue as a real build, but only warnings and errors reach the
+    # terminal, on stderr, so progress lines neither interleave with the results nor get lost
+    setup_logging(logging.WARNING, sys.stderr)
+    benchmarks = micro_benchmarks(args.repeat, args.seed)
+    benchmarks["generate_pages_recursive"] = end_to_end_benchmark(args.pages, min(args.repeat, 3), args.seed, args.jobs)
+    benchmarks["generate_pages_recursive_links"] = end_to_end_benchmark(args.pages, min(args.repeat, 3), args.seed, args.jobs, check_links=True)
+    # The generated links all point at missing pages, so the check reports every reference
+    link_overhead = link_overhead_benchmark(args.pages, max(args.repeat, 5), args.seed)
+    if args.jobs <= 1:
+        benchmarks["generate_pages_pipelined"] = end_to_end_benchmark(args.pages, min(args.repeat, 3), args.seed, pipeline=True)
+    stop_logging()
+    results = {
+        "params": {"pages": args.pages, "repeat": args.repeat, "seed": args.seed, "jobs": args.jobs},
+        "python": platform.python_version(),
+        "benchmarks": benchmarks,
+        "link_check_overhead": link_overhead,
+    }
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    else:
+        regressions = []
+        for name, seconds in benchmarks.items():
+            print(f"{name:>32} {seconds * 1000:10.3f} ms")
+
+    for stage, overhead in link_overhead.items():
+        print(f"{'link ' + stage + ' overhead':>32} {overhead:10.1%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        sys.exit(1)
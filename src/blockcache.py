@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import logging
+from collections import OrderedDict
+from blocks import *
+import inline
+import blocks
+import htmlnode
+import textnode
+
+# Bumped when the layout of the saved file changes
+CACHE_FORMAT = 3
+
+
+def renderer_version() -> str:
+    """
+    Identifies the code that renders blocks: a hash of the cache format and the source of the
+    modules that turn markdown into HTML. Any change to them gives a new version, so HTML
+    rendered by an older renderer is never reused from disk.
+    """
+    digest = hashlib.blake2b(str(CACHE_FORMAT).encode("ascii"), digest_size=8)
+    for module in (blocks, inline, textnode, htmlnode):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+RENDERER_VERSION = renderer_version()
+
+
+class BlockCache:
+    """
+    Bounded LRU cache of rendered HTML fragments keyed by a hash of the markdown block text.
+    Identical blocks (shared disclaimers, repeated code samples) are classified and rendered
+    once per build, and the cache can be saved to disk to carry over to the next build.
+    When the HTML of a block depends on more than its text (like image dimensions), the namespace
+    names that state: it goes into every key, so entries rendered under other state never match.
+    """
+    def __init__(self, maxsize: int = 4096, path=None, max_block_size: int = 1 << 16, namespace: str = ""):
+        self.maxsize = maxsize
+        self.path = path
+        self.namespace = namespace
+        # Very large blocks are rarely repeated and would crowd out everything else
+        self.max_block_size = max_block_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def key(self, block: str) -> str:
+        digest = hashlib.blake2b(block.encode("utf-8"), digest_size=16)
+        if self.namespace:
+            digest.update(self.namespace.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, block: str):
+        """
+        Returns the cached (html, references, nodes) of a block, or None. nodes is the number
+        of nodes in the block's tree as counted by the profiler, or None if it never counted them.
+        """
+        key = self.key(block)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, block: str):
+        entry = self.lookup(block)
+        return entry[0] if entry is not None else None
+
+    def put(self, block: str, html: str, references=(), nodes=None):
+        if len(block) > self.max_block_size:
+            return
+        key = self.key(block)
+        self.entries[key] = (html, tuple(references), nodes)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def render_entry(self, block, images=None):
+        """
+        Returns the HTML and the link and image references of a block (markdown text or a typed
+        Block), rendering and caching them on a miss. References are kept with the HTML so a
+        cache hit still reports the block's links. An image catalog must match the namespace.
+        """
+        if isinstance(block, Block):
+            text, node = block.text, block.to_html_node
+        else:
+            text, node = block, lambda references, images: block_to_html_node(block, block_to_block_type(block), None, references, images)
+        entry = self.lookup(text)
+        if entry is None:
+            references = []
+            entry = (node(references, images).to_html(), tuple(references))
+            self.put(text, *entry)
+        return entry[0], entry[1]
+
+    def render(self, block) -> str:
+        """
+        Returns the HTML for a block, rendering and caching it on a miss.
+        """
+        return self.render_entry(block)[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.entries),
+        }
+
+    def load(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != RENDERER_VERSION:
+            # Saved by another version of the renderer, whose HTML may differ
+            logging.info(f"Block cache {path} is from another renderer version, starting over")
+            return
+        for key, html, references, nodes in data["entries"]:
+            self.entries[key] = (html, tuple(tuple(reference) for reference in references), nodes)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def save(self, path=None):
+        # Entries are stored least recently used first so the LRU order survives a reload
+        with open(path or self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": RENDERER_VERSION, "entries": [[key, html, references, nodes] for key, (html, references, nodes) in self.entries.items()]}, f)
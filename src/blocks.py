@@ -1,33 +1,50 @@
 from enum import Enum
+from itertools import chain, repeat
 from htmlnode import *
 from textnode import *
 from inline import *
 
-def markdown_to_blocks(markdown):
-    blocks = []
+def iter_block_lines(lines):
+    """
+    Lazily splits an iterable of lines (from str.splitlines() or open_source) into markdown
+    blocks, yielding each block's lines and the index of its first line in the input.
+    Only the block currently being collected is held in memory.
+    """
     current_block = []
+    start = 0
     in_code_block = False
 
-    for line in markdown.splitlines():
+    for number, line in enumerate(lines):
+        line = line.rstrip("\n")
+        if not current_block:
+            start = number
         if line.startswith("```"):
             in_code_block = not in_code_block
             current_block.append(line)
             if not in_code_block:
-                blocks.append("\n".join(current_block))
+                yield current_block, start
                 current_block = []
         elif in_code_block:
             current_block.append(line)
         elif line.strip() == "":
             if current_block:
-                blocks.append("\n".join(current_block))
+                yield current_block, start
                 current_block = []
         else:
             current_block.append(line)
 
     if current_block:
-        blocks.append("\n".join(current_block))
+        yield current_block, start
+
+def iter_blocks(lines):
+    """
+    Lazily splits an iterable of lines (a list or an open file) into markdown blocks.
+    """
+    for block_lines, _ in iter_block_lines(lines):
+        yield "\n".join(block_lines)
 
-    return blocks
+def markdown_to_blocks(markdown):
+    return list(iter_blocks(markdown.splitlines()))
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -84,23 +101,100 @@ def is_ordered_list(markup_block):
 
     return True
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
-    children = []
-    for text_node in text_nodes:
-        html_node = text_node.text_node_to_html_node()
-        children.append(html_node)
-    return children
+def classify_lines(lines):
+    """
+    Classifies a block from its lines in a single pass, with the same result as
+    block_to_block_type. The lines must be split the way str.splitlines() splits them.
+    """
+    first_line = lines[0]
+    if first_line[0] == "#":
+        return BlockType.HEADING
+    if first_line.startswith("```") and lines[-1].startswith("```"):
+        return BlockType.CODE
+
+    if "" in lines:
+        # Only an unterminated code fence keeps blank lines; classify it the original way
+        return block_to_block_type("\n".join(lines))
+
+    # A line can only fit one of the remaining types, so the first line picks the candidate
+    # and the other lines are checked against that candidate alone
+    if first_line[0] == ">":
+        return BlockType.QUOTE if all(map(str.startswith, lines, repeat(">"))) else BlockType.PARAGRAPH
+    if first_line.startswith("- "):
+        return BlockType.UNORDERED_LIST if all(map(str.startswith, lines, repeat("- "))) else BlockType.PARAGRAPH
+    for expected_number, line in enumerate(lines, 1):
+        parts = line.strip().split(".", 1)
+        if len(parts) != 2 or not parts[0].isdigit() or not parts[1].startswith(" ") or int(parts[0]) != expected_number:
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+class Block:
+    """
+    A markdown block with its lines, type and the index of its first line in the source.
+    """
+    __slots__ = ("text", "lines", "block_type", "start")
+
+    def __init__(self, text, lines, block_type, start=0):
+        self.text = text
+        self.lines = lines
+        self.block_type = block_type
+        self.start = start
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Block)
+            and self.text == other.text
+            and self.block_type == other.block_type
+            and self.start == other.start
+        )
+
+    def __repr__(self):
+        return f"Block({self.block_type}, line {self.start}, {self.text!r})"
 
-def block_to_html_node(block, block_type):
+    def to_html_node(self, references=None, images=None):
+        return block_to_html_node(self.text, self.block_type, self.lines, references, images)
+
+def type_block(lines, start=0) -> Block:
+    return Block("\n".join(lines), lines, classify_lines(lines), start)
+
+def iter_typed_blocks(lines):
+    """
+    Like iter_blocks, but yields Block objects classified as they are split, so no block
+    has to be split into lines again to find its type or convert it to HTML.
+    """
+    for block_lines, start in iter_block_lines(lines):
+        yield type_block(block_lines, start)
+
+def markdown_to_typed_blocks(markdown):
+    return list(iter_typed_blocks(markdown.splitlines()))
+
+def text_to_children(text, references=None, images=None):
+    # TextNodes render themselves, so they are used as children directly instead of
+    # being converted to a LeafNode each
+    nodes = text_to_textnodes(text)
+    # Every link and image has a "](", so text without one is not searched for them
+    if references is not None and "](" in text:
+        # The scanner only gives link and image nodes a url
+        references += [("image" if node.text_type is TextType.IMAGE else "link", node.url) for node in nodes if node.url is not None]
+    if images is not None and "![" in text:
+        nodes = [images.img_node(node) if node.text_type is TextType.IMAGE else node for node in nodes]
+    return nodes
+
+def block_to_html_node(block, block_type, lines=None, references=None, images=None, to_children=text_to_children):
+    # Callers that already have the block's lines (see Block) pass them to skip re-splitting.
+    # With a references list, the (type, url) of every link and image is appended to it
+    # as the inline text is scanned. With an image catalog, images get their dimensions.
+    # The profiler passes its own to_children to time inline parsing apart from building the tree.
+    if lines is None and block_type in (BlockType.QUOTE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        lines = block.splitlines()
     if block_type == BlockType.PARAGRAPH:
         block = block.replace("\n", " ")
-        children = text_to_children(block)
+        children = to_children(block, references, images)
         return ParentNode("p", children)
     elif block_type == BlockType.HEADING:
         level = block.count("#")
         text = block.lstrip("#").lstrip()
-        children = text_to_children(text)
+        children = to_children(text, references, images)
         return ParentNode(f"h{level}", children)
     elif block_type == BlockType.CODE:
         # Remove the triple backticks and preserve newlines
@@ -112,37 +206,47 @@ def block_to_html_node(block, block_type):
             code_content = code_content.lstrip("\n")  # Remove leading newline
         return ParentNode("pre", [LeafNode("code", code_content)])
     elif block_type == BlockType.QUOTE:
-        lines = block.splitlines()
         stripped_lines = [line.lstrip(">").lstrip() for line in lines]
         quote_text = "\n".join(stripped_lines)
-        children = text_to_children(quote_text)
+        children = to_children(quote_text, references, images)
         return ParentNode("blockquote", children)
     elif block_type == BlockType.UNORDERED_LIST:
-        items = block.splitlines()
+        items = lines
         list_items = []
         for item in items:
             item_text = item.lstrip("-").lstrip()
-            children = text_to_children(item_text)
+            children = to_children(item_text, references, images)
             list_items.append(ParentNode("li", children))
         return ParentNode("ul", list_items)
     elif block_type == BlockType.ORDERED_LIST:
-        items = block.splitlines()
+        items = lines
         list_items = []
         for item in items:
             item_text = item.split(".", 1)[1].lstrip()
-            children = text_to_children(item_text)
+            children = to_children(item_text, references, images)
             list_items.append(ParentNode("li", children))
         return ParentNode("ol", list_items)
     else:
         raise ValueError(f"Invalid block type: {block_type}")
     
+def iter_html_blocks(lines, block_cache=None, references=None, images=None):
+    """
+    Converts markdown blocks to HTML one at a time, yielding each block's HTML as soon as it is rendered.
+    With a block cache, blocks that were already rendered are looked up instead.
+    With a references list, the (type, url) of every link and image is appended to it.
+    With an image catalog, <img> tags get the width and height of the image.
+    """
+    for block in iter_typed_blocks(lines):
+        if block_cache is not None:
+            html, block_references = block_cache.render_entry(block, images)
+            if references is not None:
+                references.extend(block_references)
+            yield html
+            continue
+        yield block.to_html_node(references, images).to_html()
+
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        html_node = block_to_html_node(block, block_type)
-        children.append(html_node)
+    children = [block.to_html_node() for block in markdown_to_typed_blocks(markdown)]
     return ParentNode("div", children)
 
 def extract_title(markdown: str) -> str:
@@ -151,11 +255,29 @@ def extract_title(markdown: str) -> str:
     The title is the first line that starts with a single # (H1 header).
     If no H1 header is found, raises an exception.
     """
-    for line in markdown.splitlines():
+    return extract_title_from_lines(markdown.splitlines())
+
+def extract_title_from_lines(lines) -> str:
+    """
+    Same as extract_title, but reads from an iterable of lines and stops at the first H1.
+    """
+    return split_title(lines)[0]
+
+def split_title(lines):
+    """
+    Finds the title in an iterable of lines, stopping at the first H1, and returns it with an
+    iterable of all the lines from the start, so the title and the blocks come from one scan of
+    the source. The lines read up to the title are buffered and replayed; the title is usually
+    on the first line.
+    """
+    lines = iter(lines)
+    buffered = []
+    for line in lines:
+        buffered.append(line)
         if line.startswith("# "):
             # Extract the title text after the #
             title = line.lstrip("#").strip()
-            return title
+            return title, chain(buffered, lines)
 
     # If no H1 header is found, raise an exception
     raise ValueError("No H1 header found in the markdown content.")
\ No newline at end of file
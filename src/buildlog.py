@@ -0,0 +1,81 @@
+import sys
+import time
+import logging
+import logging.handlers
+import multiprocessing
+
+# Queue shared by the main process and parallel workers, drained by one listener thread
+_log_queue = None
+_listener = None
+
+
+def setup_logging(level=logging.INFO, stream=None):
+    """
+    Routes all log records through a queue to a single listener thread that writes them to the
+    stream, so neither the build nor worker processes block on terminal writes.
+    Returns the queue to hand to worker processes.
+    """
+    global _log_queue, _listener
+    stop_logging()
+    _log_queue = multiprocessing.Queue()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = logging.handlers.QueueListener(_log_queue, handler, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(_log_queue)]
+    root.setLevel(level)
+    return _log_queue
+
+
+def attach_worker(log_queue, level=logging.INFO):
+    """
+    Sends a worker process's log records to the main process's queue.
+    """
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)] if log_queue is not None else []
+    root.setLevel(level)
+
+
+def get_log_queue():
+    return _log_queue
+
+
+def stop_logging():
+    """
+    Flushes every queued record and stops the listener.
+    """
+    global _log_queue, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        _log_queue = None
+
+
+class Progress:
+    """
+    Logs one line every `every` items and a summary when finished, instead of a line per file.
+    """
+    def __init__(self, label: str, total=None, every: int = 100):
+        self.label = label
+        self.total = total
+        self.every = max(every, 1)
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def advance(self, n: int = 1):
+        previous = self.count
+        self.count += n
+        if self.count // self.every > previous // self.every:
+            if self.total:
+                logging.info(f"{self.label}: {self.count}/{self.total}")
+            else:
+                logging.info(f"{self.label}: {self.count}")
+
+    def finish(self, detail: str = ""):
+        elapsed = time.perf_counter() - self.started
+        summary = f"{self.label}: {self.count} done in {elapsed:.2f}s"
+        if detail:
+            summary += f" ({detail})"
+        logging.info(summary)
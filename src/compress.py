@@ -0,0 +1,137 @@
+import os
+import gzip
+import json
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from manifest import HashCache
+
+try:
+    import brotli
+except ImportError:
+    # Only gzip siblings can be made without the brotli package
+    brotli = None
+
+COMPRESSION_FORMATS = ("gzip", "br")
+# File name suffix of the sibling of each format, as static servers look them up
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg")
+
+# Distinguishes temp files of siblings written by different threads
+_temp_counter = itertools.count()
+
+
+def compress_bytes(data: bytes, fmt: str) -> bytes:
+    """
+    Compresses at the highest level, since it is done once per build and served many times.
+    The gzip header gets no timestamp, so the same input always gives the same bytes.
+    """
+    if fmt == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if fmt == "br":
+        if brotli is None:
+            raise RuntimeError("brotli is not installed")
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Invalid compression format: {fmt}")
+
+
+class Compressor:
+    """
+    Writes precompressed siblings (page.html.gz, page.html.br) of the HTML, CSS and JS outputs
+    in a pool of background threads, so compression overlaps with rendering and copying instead
+    of reading every file again in a pass after the build. zlib and brotli release the GIL
+    while compressing, so the threads run in parallel.
+    The content hash each output's siblings were made from is kept in a cache file; an output
+    whose hash matches, and whose siblings are still there, is skipped.
+    """
+    def __init__(self, formats=("gzip",), cache_path=None, workers=None):
+        self.formats = tuple(formats)
+        self.cache_path = cache_path
+        # Content hashes of outputs whose writer did not already hash them (copied static files)
+        self.hashes = HashCache()
+        # Output path -> content hash its siblings were made from
+        self.compressed = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.hashes = HashCache(data.get("files", {}))
+            self.compressed = data.get("compressed", {})
+        self.seen = set()
+        self.counts = {"compressed": 0, "unchanged": 0}
+        # Bytes read and bytes written per format
+        self.sizes = {"input": 0, **{fmt: 0 for fmt in self.formats}}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compress")
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def siblings(self, path: str) -> list:
+        return [path + SUFFIXES[fmt] for fmt in self.formats]
+
+    def submit(self, path: str, digest=None) -> list:
+        """
+        Schedules the siblings of an output file and returns their paths, or [] for files that
+        are not compressed. Writers that hashed the content pass its SHA-256 digest; otherwise
+        the file is hashed through the hash cache, so it is only read when its size or mtime changed.
+        """
+        if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+            return []
+        siblings = self.siblings(path)
+        with self._lock:
+            self.seen.add(path)
+            if digest is None:
+                stat = os.stat(path)
+                digest = self.hashes.digest(path, stat.st_size, stat.st_mtime_ns)
+            if self.compressed.get(path) == digest and all(os.path.exists(sibling) for sibling in siblings):
+                self.counts["unchanged"] += 1
+                return siblings
+            self._futures.append(self._executor.submit(self._compress, path, digest, siblings))
+        return siblings
+
+    def _compress(self, path: str, digest: str, siblings: list):
+        with open(path, "rb") as f:
+            data = f.read()
+        sizes = {"input": len(data)}
+        for fmt, sibling in zip(self.formats, siblings):
+            compressed = compress_bytes(data, fmt)
+            directory, name = os.path.split(sibling)
+            temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{next(_temp_counter)}.tmp")
+            with open(temp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(temp_path, sibling)
+            sizes[fmt] = len(compressed)
+        with self._lock:
+            self.compressed[path] = digest
+            self.counts["compressed"] += 1
+            for name, size in sizes.items():
+                self.sizes[name] += size
+        logging.debug(f"Compressed {path}")
+
+    def wait(self):
+        """
+        Blocks until every scheduled file is compressed; re-raises the first error.
+        """
+        with self._lock:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self, removed=()):
+        """
+        Waits for pending files, deletes the siblings of removed outputs and saves the cache.
+        Outputs that were not produced by this build but are still on disk (pages an incremental
+        build skipped) keep their entries.
+        """
+        self.wait()
+        self._executor.shutdown()
+        for path in removed:
+            self.compressed.pop(path, None)
+            for sibling in self.siblings(path):
+                if os.path.exists(sibling):
+                    os.remove(sibling)
+        self.compressed = {path: digest for path, digest in self.compressed.items() if path in self.seen or os.path.exists(path)}
+        if self.cache_path is not None:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self.hashes.to_dict(), "compressed": self.compressed}, f, indent=1, sort_keys=True)
+        savings = ", ".join(f"{fmt} {self.sizes[fmt] / self.sizes['input']:.0%}" for fmt in self.formats if self.sizes["input"])
+        logging.info(f"Compressed: {self.counts['compressed']} files, {self.counts['unchanged']} unchanged" + (f" (size {savings})" if savings else ""))
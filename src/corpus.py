@@ -0,0 +1,128 @@
+import os
+import random
+import argparse
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+# Relative weights of each block kind in generated pages
+DEFAULT_MIX = {
+    "heading": 2,
+    "paragraph": 6,
+    "unordered_list": 2,
+    "ordered_list": 1,
+    "code": 1,
+    "quote": 1,
+}
+
+WORDS = ("the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "ring", "shire",
+         "wizard", "mountain", "river", "elven", "road", "goes", "ever", "on")
+
+
+def _sentence(rng: random.Random, inline: float) -> str:
+    """
+    Builds a sentence where roughly `inline` of the spans carry markup, links or images.
+    """
+    parts = []
+    for i in range(rng.randint(6, 16)):
+        word = rng.choice(WORDS)
+        if rng.random() >= inline:
+            parts.append(word)
+            continue
+        kind = rng.randrange(5)
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"_{word}_")
+        elif kind == 2:
+            parts.append(f"`{word}`")
+        elif kind == 3:
+            parts.append(f"[{word}](/pages/{rng.randrange(1000)})")
+        else:
+            parts.append(f"![{word}](/images/{word}.png)")
+    return " ".join(parts).capitalize() + "."
+
+
+def generate_block(rng: random.Random, kind: str, inline: float = 0.2) -> str:
+    if kind == "heading":
+        return "#" * rng.randint(2, 4) + " " + _sentence(rng, inline)
+    if kind == "paragraph":
+        return "\n".join(_sentence(rng, inline) for _ in range(rng.randint(1, 4)))
+    if kind == "unordered_list":
+        return "\n".join("- " + _sentence(rng, inline) for _ in range(rng.randint(2, 8)))
+    if kind == "ordered_list":
+        return "\n".join(f"{i + 1}. " + _sentence(rng, inline) for i in range(rng.randint(2, 8)))
+    if kind == "code":
+        lines = [f"    {rng.choice(WORDS)}({rng.randrange(100)})" for _ in range(rng.randint(2, 10))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    if kind == "quote":
+        return "\n".join("> " + _sentence(rng, inline) for _ in range(rng.randint(1, 4)))
+    raise ValueError(f"Invalid block kind: {kind}")
+
+
+def generate_markdown(rng: random.Random, blocks: int, mix=None, inline: float = 0.2) -> str:
+    """
+    Generates one markdown page with a title and the given number of blocks drawn from the mix.
+    """
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    title = "# " + _sentence(rng, 0).rstrip(".")
+    body = [generate_block(rng, kind, inline) for kind in rng.choices(kinds, weights, k=blocks)]
+    return "\n\n".join([title] + body) + "\n"
+
+
+def generate_corpus(root: str, pages: int, blocks: int = 40, mix=None, inline: float = 0.2, depth: int = 3, fanout: int = 10, seed: int = 0) -> dict:
+    """
+    Writes a deterministic synthetic site under root: content/ with `pages` markdown files
+    nested up to `depth` directories deep, a template.html and a static/ directory.
+    Returns the paths of the generated content directory, template and static directory.
+    """
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    for i in range(pages):
+        # Spread pages over nested directories, `fanout` entries per level
+        parts = []
+        n = i
+        for _ in range(depth):
+            parts.append(f"d{n % fanout}")
+            n //= fanout
+        page_dir = os.path.join(content_dir, *parts, f"page{i}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w", encoding="utf-8") as f:
+            f.write(generate_markdown(rng, blocks, mix, inline))
+
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w", encoding="utf-8") as f:
+        f.write(TEMPLATE)
+    static_dir = os.path.join(root, "static")
+    os.makedirs(os.path.join(static_dir, "images"), exist_ok=True)
+    with open(os.path.join(static_dir, "index.css"), "w", encoding="utf-8") as f:
+        f.write("body { margin: 0; }\n")
+    for word in WORDS:
+        with open(os.path.join(static_dir, "images", f"{word}.png"), "wb") as f:
+            f.write(bytes(rng.randrange(256) for _ in range(256)))
+    return {"content": content_dir, "template": template_path, "static": static_dir}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic site for benchmarks.")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--blocks", type=int, default=40)
+    parser.add_argument("--inline", type=float, default=0.2, help="fraction of words carrying inline markup")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_corpus(args.root, args.pages, args.blocks, inline=args.inline, depth=args.depth, seed=args.seed)
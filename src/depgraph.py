@@ -0,0 +1,65 @@
+class DependencyGraph:
+    """
+    Records which inputs (markdown source, template, included partials, static files) went into
+    each output, together with the reverse index from every input to the outputs built from it.
+    The reverse index makes "which outputs are dirty" cost proportional to the changed paths
+    and their dependents rather than to the size of the site.
+    """
+    def __init__(self):
+        # Output path -> list of input paths, in the order they were recorded
+        self.inputs = {}
+        # Input path -> set of output paths
+        self.dependents = {}
+
+    def __contains__(self, output: str) -> bool:
+        return output in self.inputs
+
+    def __len__(self) -> int:
+        return len(self.inputs)
+
+    def outputs(self) -> list:
+        return list(self.inputs)
+
+    def inputs_of(self, output: str) -> list:
+        return self.inputs.get(output, [])
+
+    def dependents_of(self, path: str) -> set:
+        return self.dependents.get(path, set())
+
+    def set_inputs(self, output: str, inputs):
+        """
+        Replaces the recorded inputs of an output.
+        """
+        self.remove_output(output)
+        self.inputs[output] = list(inputs)
+        for path in self.inputs[output]:
+            self.dependents.setdefault(path, set()).add(output)
+
+    def remove_output(self, output: str):
+        for path in self.inputs.pop(output, []):
+            outputs = self.dependents.get(path)
+            if outputs is None:
+                continue
+            outputs.discard(output)
+            if not outputs:
+                del self.dependents[path]
+
+    def dirty(self, changed_paths) -> set:
+        """
+        Returns every output built from any of the changed paths.
+        """
+        dirty = set()
+        for path in changed_paths:
+            dirty.update(self.dependents.get(path, ()))
+        return dirty
+
+    def to_dict(self) -> dict:
+        # Only the forward edges are stored; the reverse index is rebuilt on load
+        return {output: list(inputs) for output, inputs in self.inputs.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        graph = cls()
+        for output, inputs in data.items():
+            graph.set_inputs(output, inputs)
+        return graph
@@ -0,0 +1,99 @@
+import os
+import json
+
+
+def _sort_key(relative_path: str) -> tuple:
+    # Comparing path components keeps a directory's files together and orders them like a
+    # depth-first walk over sorted directory listings
+    return tuple(relative_path.split(os.sep))
+
+
+class SourceIndex:
+    """
+    Flat, sorted listing of every file under a root directory with its size and mtime,
+    built in a single os.scandir walk. Pages (the .md files) and assets are both taken from
+    it, so content discovery, static copying and incremental builds share one pass.
+    The mtime of every directory is kept too: adding, removing or renaming a file changes
+    its directory's mtime, so a saved index can be checked with one stat per directory.
+    """
+    def __init__(self, root: str, files: list, directories: dict, fresh: bool = True):
+        self.root = root
+        # Sorted (relative path, size, mtime_ns) tuples
+        self.files = files
+        # Relative directory path ("." for the root) -> mtime_ns
+        self.directories = directories
+        # False when loaded from disk: the listing is valid, but a file edited in place keeps
+        # its directory's mtime, so sizes and mtimes may be out of date
+        self.fresh = fresh
+
+    @classmethod
+    def scan(cls, root: str):
+        files = []
+        directories = {".": os.stat(root).st_mtime_ns}
+        pending = [(root, "")]
+        while pending:
+            dir_path, prefix = pending.pop()
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    relative_path = prefix + entry.name
+                    if entry.is_dir():
+                        directories[relative_path] = entry.stat().st_mtime_ns
+                        pending.append((entry.path, relative_path + os.sep))
+                    else:
+                        stat = entry.stat()
+                        files.append((relative_path, stat.st_size, stat.st_mtime_ns))
+        files.sort(key=lambda file: _sort_key(file[0]))
+        return cls(root, files, directories)
+
+    def path(self, relative_path: str) -> str:
+        return os.path.join(self.root, relative_path)
+
+    def pages(self) -> list:
+        return [relative_path for relative_path, _, _ in self.files if relative_path.endswith(".md")]
+
+    def is_current(self) -> bool:
+        """
+        Reports whether no file was added, removed or renamed since the index was built.
+        """
+        try:
+            for relative_path, mtime_ns in self.directories.items():
+                if os.stat(self.path(relative_path)).st_mtime_ns != mtime_ns:
+                    return False
+        except FileNotFoundError:
+            return False
+        return True
+
+    def to_dict(self) -> dict:
+        return {"files": self.files, "directories": self.directories}
+
+    @classmethod
+    def from_dict(cls, root: str, data: dict):
+        return cls(root, [tuple(file) for file in data["files"]], data["directories"], fresh=False)
+
+
+def discover(root: str, cache=None) -> SourceIndex:
+    """
+    Returns the index of a directory. With a cache (a dict of serialized indexes by root, see
+    load_index_cache), an index whose directories are unchanged is reused without walking the
+    tree; otherwise the tree is scanned and the cache updated.
+    """
+    if cache is not None and root in cache:
+        index = SourceIndex.from_dict(root, cache[root])
+        if index.is_current():
+            return index
+    index = SourceIndex.scan(root)
+    if cache is not None:
+        cache[root] = index.to_dict()
+    return index
+
+
+def load_index_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_index_cache(path: str, cache: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
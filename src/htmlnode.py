@@ -1,60 +1,92 @@
 
 class HTMLNode:
+    # Slots instead of a per-instance __dict__ keep large page trees small
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
-    
+
     def to_html(self):
         raise NotImplementedError("to_html not implemented at this level")
-    
+
+    def _render(self, out):
+        # Appends this node's HTML fragments to a shared list; subclasses write into it directly
+        out.append(self.to_html())
+
+    def iter_html(self):
+        # Yields the HTML one top-level child at a time instead of building the whole string
+        yield self.to_html()
+
+    def write_html(self, fp):
+        for fragment in self.iter_html():
+            fp.write(fragment)
+
     def props_to_html(self):
-        html_content = ""
-        for attribute_type, content in self.props.items():
-            html_content = html_content + " " + attribute_type + "=\"" + content + "\""
-        return html_content
-    
+        return "".join([f" {attribute_type}=\"{content}\"" for attribute_type, content in self.props.items()])
+
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
-    
+
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
-        
+
     def to_html(self):
+        out = []
+        self._render(out)
+        return "".join(out)
+
+    def _render(self, out):
         if self.value == None:
             #debug
             print(self)
             raise ValueError("value cannot be blank for a leaf node")
         if self.tag == None:
-            return self.value
+            out.append(self.value)
+            return
         if self.props == None:
-            constructed_html = f"<{self.tag}>{self.value}</{self.tag}>"
-            return constructed_html
-        constructed_html = f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-        return constructed_html
-    
+            out.append(f"<{self.tag}>{self.value}</{self.tag}>")
+            return
+        out.append(f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>")
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
-    
+
     def to_html(self):
+        # Render into one shared list of fragments and join once, so the cost is linear in the output size
+        out = []
+        self._render(out)
+        return "".join(out)
+
+    def _check(self):
         if self.tag == None:
             raise ValueError("tag cannot be blank for ParentNode")
         if self.children == None:
             raise ValueError("children cannot be blank for ParentNode")
-        constructed_html = f"<{self.tag}"
-        if self.props != None:
-            constructed_html = constructed_html + f"{self.props_to_html()}"
-        constructed_html = constructed_html + ">"
-        for child in self.children:
-            constructed_html = constructed_html + child.to_html()
-        constructed_html = constructed_html + f"</{self.tag}>"
-        return constructed_html
-        
-        
 
+    def _open_tag(self):
+        if self.props != None:
+            return f"<{self.tag}{self.props_to_html()}>"
+        return f"<{self.tag}>"
 
+    def _render(self, out):
+        self._check()
+        out.append(self._open_tag())
+        for child in self.children:
+            child._render(out)
+        out.append(f"</{self.tag}>")
 
-    
+    def iter_html(self):
+        self._check()
+        yield self._open_tag()
+        for child in self.children:
+            yield child.to_html()
+        yield f"</{self.tag}>"
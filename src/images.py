@@ -0,0 +1,241 @@
+import os
+import json
+import struct
+import hashlib
+import logging
+from htmlnode import LeafNode
+from manifest import HashCache
+from sync import is_unchanged, place_file, stat_signature
+
+try:
+    from PIL import Image
+except ImportError:
+    # Dimensions are read from the file headers without Pillow; only variants need it
+    Image = None
+
+# Downscaled variants are only generated when Pillow is installed
+RESIZE_SUPPORTED = Image is not None
+
+IMAGE_EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg")
+# Written into the image cache directory next to the variants
+IMAGE_CACHE_INDEX = "index.json"
+
+# JPEG start-of-frame markers, which carry the dimensions (C4, C8 and CC are other segments)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(f):
+    # Walks the segment headers after the SOI marker, seeking over every segment body
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            # Markers may be padded with fill bytes
+            marker = f.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code == 0x01 or 0xD0 <= code <= 0xD9:
+            continue  # Markers without a length or body
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if code in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            _, height, width = struct.unpack(">BHH", frame)
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+
+def image_size(path: str):
+    """
+    Returns the (width, height) of a PNG, GIF or JPEG file by reading its header, without
+    decoding the image, or None if the format is not recognized.
+    """
+    with open(path, "rb") as f:
+        head = f.read(24)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+    return None
+
+
+def variant_path(relative_path: str, width: int) -> str:
+    """
+    Path of a downscaled variant next to its original: images/tom.png -> images/tom-480w.png.
+    """
+    root, extension = os.path.splitext(relative_path)
+    return f"{root}-{width}w{extension}"
+
+
+class ImageCache:
+    """
+    Content-addressed store of image dimensions and downscaled variants, kept in a directory.
+    Images are keyed by the hash of their bytes, so a renamed or copied image is not processed
+    again, and each source file is matched to its hash by size and mtime, so an unchanged image
+    is not even read. Variant files are named after the hash and width.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        # Content hash of each source file
+        self.hashes = HashCache()
+        # Content hash -> {"width", "height", "variants": {width: variant file name}}
+        self.images = {}
+        self.processed = 0
+        path = os.path.join(directory, IMAGE_CACHE_INDEX)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.hashes = HashCache(data.get("files", {}))
+            self.images = data.get("images", {})
+
+    def entry(self, path: str, size: int, mtime_ns: int, widths=()):
+        """
+        Returns the entry of an image, reading its header and creating the missing
+        variants only the first time its content is seen. Returns None for unreadable images.
+        Variants are only made for widths below the original's, and only when Pillow is installed.
+        """
+        digest = self.hashes.digest(path, size, mtime_ns)
+        entry = self.images.get(digest)
+        if entry is None:
+            dimensions = image_size(path)
+            if dimensions is None:
+                return None
+            entry = {"width": dimensions[0], "height": dimensions[1], "variants": {}}
+            self.images[digest] = entry
+            self.processed += 1
+        if Image is not None:
+            for width in widths:
+                name = entry["variants"].get(str(width))
+                if width < entry["width"] and (name is None or not os.path.exists(self.path(name))):
+                    entry["variants"][str(width)] = self._resize(path, digest, width)
+        return entry
+
+    def _resize(self, path: str, digest: str, width: int) -> str:
+        name = f"{digest}-{width}w{os.path.splitext(path)[1].lower()}"
+        os.makedirs(self.directory, exist_ok=True)
+        with Image.open(path) as image:
+            height = max(1, round(image.height * width / image.width))
+            image.resize((width, height), Image.LANCZOS).save(self.path(name))
+        logging.debug(f"Created {width}px variant of {path}")
+        return name
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def save(self):
+        """
+        Writes the index, dropping the images no source file uses anymore along with their variants.
+        """
+        files = self.hashes.to_dict()
+        used = {record[2] for record in files.values()}
+        for digest in set(self.images) - used:
+            for name in self.images.pop(digest)["variants"].values():
+                if os.path.exists(self.path(name)):
+                    os.remove(self.path(name))
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(IMAGE_CACHE_INDEX), "w", encoding="utf-8") as f:
+            json.dump({"files": files, "images": self.images}, f, indent=1, sort_keys=True)
+
+
+class ImageCatalog:
+    """
+    Dimensions and variants of the static images by site path ("/images/tom.png"), used to add
+    width, height and srcset to <img> tags as pages render. Only root-relative image URLs are
+    matched. The catalog is plain data, so it can be sent to worker processes.
+    """
+    def __init__(self, props=None, sources=None, signatures=None, variants=None):
+        # Site path -> extra <img> attributes
+        self.props = props if props is not None else {}
+        # Site path -> source file
+        self.sources = sources if sources is not None else {}
+        # Source file -> size and mtime, the signature the static sync records for it
+        self.signatures = signatures if signatures is not None else {}
+        # Variant path relative to the output directory -> file in the image cache
+        self.variants = variants if variants is not None else {}
+        # Rendered HTML depends on the attributes, so block caches are namespaced by them
+        self.namespace = hashlib.blake2b(json.dumps(self.props, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+
+    @classmethod
+    def scan(cls, index, cache: ImageCache, widths=()):
+        """
+        Catalogs every image in a source index of the static directory through the image cache.
+        """
+        props, sources, signatures, variants = {}, {}, {}, {}
+        for relative_path, size, mtime_ns in index.files:
+            if not relative_path.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = index.path(relative_path)
+            if not index.fresh:
+                # A reused index may have an outdated size and mtime for a file edited in place
+                signature = stat_signature(path)
+                size, mtime_ns = signature["size"], signature["mtime_ns"]
+            entry = cache.entry(path, size, mtime_ns, widths)
+            if entry is None:
+                logging.warning(f"Could not read the dimensions of {path}")
+                continue
+            url = "/" + relative_path.replace(os.sep, "/")
+            props[url] = {"width": str(entry["width"]), "height": str(entry["height"])}
+            candidates = []
+            for width, name in sorted(entry["variants"].items(), key=lambda item: int(item[0])):
+                if int(width) not in widths:
+                    continue
+                output_path = variant_path(relative_path, width)
+                variants[output_path] = cache.path(name)
+                candidates.append(f"/{output_path.replace(os.sep, '/')} {width}w")
+            if candidates:
+                props[url]["srcset"] = ", ".join(candidates + [f"{url} {entry['width']}w"])
+            sources[url] = path
+            signatures[path] = {"size": size, "mtime_ns": mtime_ns}
+        logging.info(f"Images: {len(props)} cataloged, {cache.processed} processed, {len(variants)} variants")
+        return cls(props, sources, signatures, variants)
+
+    def img_node(self, node):
+        """
+        Returns an <img> LeafNode with the image's dimensions for an IMAGE TextNode, or the
+        node itself when the image is not in the catalog.
+        """
+        props = self.props.get(node.url)
+        if props is None:
+            return node
+        return LeafNode("img", "", {"src": node.url, "alt": node.text, **props})
+
+    def dependencies(self, references) -> list:
+        """
+        Returns the source files of the cataloged images among a page's (type, url) references.
+        """
+        paths = []
+        for kind, url in references:
+            path = self.sources.get(url) if kind == "image" else None
+            if path is not None and path not in paths:
+                paths.append(path)
+        return paths
+
+    def place_variants(self, output_dir: str, link_mode: str = "copy", writer=None, manifest=None) -> int:
+        """
+        Puts the variants from the image cache into the output directory next to their originals.
+        Returns the number of files copied.
+        """
+        copied = 0
+        for output_path, cache_file in self.variants.items():
+            dest_file = os.path.normpath(os.path.join(output_dir, output_path))
+            signature = stat_signature(cache_file)
+            if not is_unchanged(cache_file, dest_file, src_signature=signature):
+                os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+                place_file(cache_file, dest_file, link_mode)
+                copied += 1
+            if manifest is not None:
+                manifest.record(dest_file, [cache_file], {cache_file: signature})
+            if writer is not None:
+                writer.keep(dest_file)
+        return copied
@@ -1,6 +1,11 @@
 from textnode import *
 import re
 
+# Inline delimiters in the precedence order the split passes apply them
+_DELIMITER_PATTERN = re.compile(r"\*\*|`|_")
+_IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_list = []
     for node in old_nodes:
@@ -9,6 +14,12 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             new_list.append(node)
             continue
 
+        # Text without the delimiter is passed through as it is
+        if delimiter not in node.text:
+            if node.text:
+                new_list.append(node)
+            continue
+
         # Split the text by the delimiter
         parts = node.text.split(delimiter)
 
@@ -30,18 +41,18 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_list
 
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = _IMAGE_PATTERN.findall(text)
     return matches
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = _LINK_PATTERN.findall(text)
     return matches
 
 def split_nodes_image(old_nodes):
     result = []
     
     for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
+        if old_node.text_type != TextType.TEXT or "[" not in old_node.text:
             result.append(old_node)
             continue
             
@@ -75,7 +86,7 @@ def split_nodes_link(old_nodes):
     result = []
     
     for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
+        if old_node.text_type != TextType.TEXT or "[" not in old_node.text:
             result.append(old_node)
             continue
             
@@ -105,11 +116,102 @@ def split_nodes_link(old_nodes):
     
     return result
 
+def _append_links(nodes, text):
+    position = 0
+    for match in _LINK_PATTERN.finditer(text):
+        if match.start() > position:
+            nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+        nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        position = match.end()
+    if position < len(text):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
+
+def _append_text(nodes, text):
+    """
+    Appends a plain text segment, splitting out its images first and then the links between them.
+    """
+    if "[" not in text:
+        nodes.append(TextNode(text, TextType.TEXT))
+        return
+    position = 0
+    for match in _IMAGE_PATTERN.finditer(text):
+        if match.start() > position:
+            _append_links(nodes, text[position:match.start()])
+        nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        position = match.end()
+    if position < len(text):
+        _append_links(nodes, text[position:])
+
+def scan_inline(text):
+    """
+    Converts inline markdown to TextNodes in one left-to-right walk over the delimiters.
+    Produces the same nodes as applying split_nodes_delimiter for **, ` and _ followed by
+    split_nodes_image and split_nodes_link, including the unmatched delimiter ValueError.
+    """
+    # Plain prose is the common case: a few substring checks for characters that can start
+    # markup and it is done. An image always contains "[", so "!" does not need its own check.
+    if "*" not in text and "`" not in text and "_" not in text and "[" not in text:
+        return [TextNode(text, TextType.TEXT)] if text else []
+
+    nodes = []
+    unmatched = set()
+    bold = code = italic = False
+    start = 0
+
+    for match in _DELIMITER_PATTERN.finditer(text):
+        delimiter = match.group()
+        if bold and delimiter != "**":
+            continue  # Bold text is not split any further
+        if code and delimiter == "_":
+            continue  # Code text is not split by the italic delimiter
+
+        segment = text[start:match.start()]
+        start = match.end()
+        if delimiter == "**":
+            if bold:
+                if segment:
+                    nodes.append(TextNode(segment, TextType.BOLD))
+                bold = False
+                continue
+            bold = True
+        elif delimiter == "`":
+            if code:
+                if segment:
+                    nodes.append(TextNode(segment, TextType.CODE))
+                code = False
+                continue
+            code = True
+        else:
+            italic = not italic
+            if not italic:
+                if segment:
+                    nodes.append(TextNode(segment, TextType.ITALIC))
+                continue
+
+        # A higher-precedence delimiter closes the surrounding text, so any open
+        # lower-precedence span in it was unmatched
+        if delimiter != "`" and code:
+            unmatched.add("`")
+            code = False
+        if delimiter != "_" and italic:
+            unmatched.add("_")
+            italic = False
+        if segment:
+            _append_text(nodes, segment)
+
+    if bold:
+        unmatched.add("**")
+    if code:
+        unmatched.add("`")
+    if italic:
+        unmatched.add("_")
+    for delimiter in ("**", "`", "_"):
+        if delimiter in unmatched:
+            raise ValueError(f"Invalid markdown syntax: unmatched delimiter '{delimiter}'")
+
+    if start < len(text):
+        _append_text(nodes, text[start:])
+    return nodes
+
 def text_to_textnodes(text):
-    new_text = [TextNode(text, TextType.TEXT)]
-    new_text = split_nodes_delimiter(new_text, "**", TextType.BOLD)
-    new_text = split_nodes_delimiter(new_text, "`", TextType.CODE)
-    new_text = split_nodes_delimiter(new_text, "_", TextType.ITALIC)
-    new_text = split_nodes_image(new_text)
-    new_text = split_nodes_link(new_text)
-    return new_text
+    return scan_inline(text)
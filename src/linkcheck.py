@@ -0,0 +1,121 @@
+import os
+import re
+import json
+import logging
+import posixpath
+from urllib.parse import unquote
+
+# URLs with a scheme (https:, mailto:) or protocol-relative ones point off the site
+_EXTERNAL_PATTERN = re.compile(r"^([a-zA-Z][a-zA-Z0-9+.-]*:|//)")
+
+
+def url_path(relative_path: str) -> str:
+    """
+    Converts a path relative to the output or static directory into a site path without the leading slash.
+    """
+    return relative_path.replace(os.sep, "/")
+
+
+def site_path(page: str, output_dir: str) -> str:
+    """
+    Returns the site path of an output file. Output paths are built by joining onto the output
+    directory, so the prefix is cut off instead of calling os.path.relpath for every page.
+    """
+    prefix = os.path.join(output_dir, "")
+    if page.startswith(prefix):
+        return url_path(page[len(prefix):])
+    return url_path(os.path.relpath(page, output_dir))
+
+
+def resolve(url: str, page: str):
+    """
+    Resolves a link or image URL found on a page (a site path like "blog/tom/index.html")
+    to the site path it points to, or None for external URLs. Fragments and query strings
+    are dropped, so a bare "#anchor" resolves to "".
+    """
+    if _EXTERNAL_PATTERN.match(url):
+        return None
+    path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+    if not path:
+        return ""
+    if not path.startswith("/"):
+        path = posixpath.join("/" + posixpath.dirname(page), path)
+    return posixpath.normpath(path).lstrip("/")
+
+
+def candidates(path: str) -> tuple:
+    # "/blog/tom" can be served by blog/tom, blog/tom.html or blog/tom/index.html
+    if path == "" or path == ".":
+        return ("index.html",)
+    return (path, path + ".html", posixpath.join(path, "index.html"))
+
+
+class LinkIndex:
+    """
+    Site-wide index of the links and images on every page, collected while pages render.
+    At the end of the build the references are resolved against the set of generated pages
+    and static files, so broken internal links are found without crawling the output.
+    """
+    def __init__(self, references=None):
+        # Output path of a page -> list of (type, url); can be the dict persisted in a build manifest
+        self.references = references if references is not None else {}
+
+    def set(self, page: str, references: list):
+        # (type, url) tuples from rendering and [type, url] lists from a saved manifest are both fine
+        self.references[page] = references
+
+    def merge(self, references: dict):
+        for page, page_references in references.items():
+            self.set(page, page_references)
+
+    def check(self, output_dir: str, pages, static_files) -> list:
+        """
+        Returns a sorted list of (page, type, url) for every internal reference that matches
+        neither a generated page nor a static file. Pages are output paths; static files are
+        paths relative to the static directory.
+        """
+        targets = {site_path(page, output_dir) for page in pages}
+        targets.update(url_path(path) for path in static_files)
+
+        def exists(url, directory):
+            path = resolve(url, posixpath.join(directory, "index.html"))
+            return path is None or path == "" or any(candidate in targets for candidate in candidates(path))
+
+        # Most references are site-absolute and repeat across pages, so each distinct URL is
+        # resolved once and then found by a plain string lookup; relative ones depend on the
+        # page's directory, which is only worked out for pages that have them
+        absolute = {}
+        relative = {}
+        broken = []
+        for page, page_references in self.references.items():
+            directory = None
+            for kind, url in page_references:
+                if url[:1] == "/":
+                    ok = absolute.get(url)
+                    if ok is None:
+                        ok = absolute[url] = exists(url, "")
+                else:
+                    if directory is None:
+                        directory = posixpath.dirname(site_path(page, output_dir))
+                    ok = relative.get((directory, url))
+                    if ok is None:
+                        ok = relative[(directory, url)] = exists(url, directory)
+                if not ok:
+                    broken.append((page, kind, url))
+        return sorted(broken)
+
+    def report(self, broken: list, path=None) -> dict:
+        """
+        Logs each broken reference and optionally writes a JSON report.
+        """
+        for page, kind, url in broken:
+            logging.error(f"Broken {kind} in {page}: {url}")
+        report = {
+            "pages": len(self.references),
+            "references": sum(len(page_references) for page_references in self.references.values()),
+            "broken": [{"page": page, "type": kind, "url": url} for page, kind, url in broken],
+        }
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=1)
+        return report
@@ -1,127 +1,510 @@
 from textnode import *
 from blocks import *
 import os
-import shutil
-import logging
 import sys
+import logging
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from manifest import BuildManifest, HashCache
+from output import OutputWriter, remove_empty_parents
+from discovery import SourceIndex, discover, load_index_cache, save_index_cache
+from shard import SHARD_STRATEGIES, Shard, parse_shard, merge_shards, template_hash
+from pipeline import generate_pages_pipelined
+from template import load_template
+from sync import sync_directory, LINK_MODES
+from linkcheck import LinkIndex
+from images import RESIZE_SUPPORTED, ImageCache, ImageCatalog
+from assets import AssetTable
+from compress import COMPRESSION_FORMATS, Compressor, brotli
+from blockcache import BlockCache
+from reader import open_source
+from profiling import BuildProfiler, TimedWriter, profiled_html_blocks, profiled_stream
+from buildlog import setup_logging, attach_worker, get_log_queue, stop_logging, Progress
+
+
+def generate_page(from_path: str, template_path: str, dest_path: str, basepath, template=None, block_cache=None, profiler=None, writer=None, references=None, images=None):
+    """
+    Generates an HTML page from a markdown file using a template.
+    Fills the {{ Title }} and {{ Content }} slots of the compiled template with the title and HTML content.
+    A precompiled template can be passed in to avoid reloading it for every page, and a block cache
+    to reuse the HTML of blocks already rendered for other pages. With a profiler, the time spent
+    in each pipeline stage is recorded for the page.
+    The markdown is read lazily in a single pass (large files through a memory map) and each block
+    is written out as soon as it is rendered, so memory stays bounded by the largest block rather
+    than the whole page. The page goes through an output
+    writer, which replaces the destination atomically and only if the HTML changed.
+    With a references list, the (type, url) of every link and image on the page is appended to it.
+    With an image catalog, <img> tags get the width, height and srcset of their image.
+    When the writer has a compressor, the compressed siblings of the page are made in the background.
+    """
+    # Log the generation message
+    logging.debug(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
+    # Load the compiled template, unless the caller already has it
+    if template is None:
+        template = load_template(template_path, basepath)
+    if writer is None:
+        writer = OutputWriter()
 
+    profile = profiler.page(from_path) if profiler is not None else None
+    started = time.perf_counter()
 
+    with open_source(from_path) as md_file:
+        # Extract the title; it is usually on the first line so this stops early, and the
+        # lines read so far are replayed to the block splitter instead of reading them again
+        title, lines = split_title(md_file)
+        if profile is not None:
+            profile.stages["read"] += time.perf_counter() - started
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format="%(message)s")
+        # Ensure the destination directory exists
+        write_started = time.perf_counter()
+        dest_dir = os.path.dirname(dest_path)
+        os.makedirs(dest_dir, exist_ok=True)
 
-def copy_directory(src: str, dst: str):
+        # Convert markdown to HTML one block at a time and stream each block into the content slot
+        if profile is not None:
+            html_blocks = profiled_html_blocks(lines, profile, block_cache, references, images)
+        else:
+            html_blocks = iter_html_blocks(lines, block_cache, references, images)
+        content = itertools.chain(["<div>"], html_blocks, ["</div>"])
+        with writer.open(dest_path) as html_file:
+            if profile is not None:
+                profile.stages["write"] += time.perf_counter() - write_started
+                profiled_stream(template, TimedWriter(html_file, profile), {"Title": title, "Content": content}, profile)
+            else:
+                template.stream(html_file, {"Title": title, "Content": content})
+            write_started = time.perf_counter()
+
+    if profile is not None:
+        # Closing the output flushes it and compares it with the existing file
+        profile.stages["write"] += time.perf_counter() - write_started
+        profile.total = time.perf_counter() - started
+        profiler.add(profile)
+
+    logging.debug(f"Page successfully generated at {dest_path}")
+
+
+def collect_pages(dir_path_content: str, dest_dir_path: str, index=None) -> list:
     """
-    Recursively copies all contents from the source directory to the destination directory.
-    Deletes all contents of the destination directory before copying to ensure a clean copy.
-    Logs the path of each file being copied.
+    Lists the content directory's markdown files as (markdown path, html path) pairs, in the
+    order of a depth-first walk over sorted directories. The destination directories are
+    created as pages are written. An existing source index of the content directory can be
+    passed in to avoid scanning it again.
     """
-    # Ensure the source directory exists
-    if not os.path.exists(src):
-        raise FileNotFoundError(f"Source directory '{src}' does not exist.")
+    if index is None:
+        index = SourceIndex.scan(dir_path_content)
+    pages = []
+    for relative_path in index.pages():
+        # Pair each markdown file with the corresponding HTML file
+        html_path = os.path.splitext(relative_path)[0] + ".html"
+        pages.append((os.path.join(dir_path_content, relative_path), os.path.join(dest_dir_path, html_path)))
+    return pages
 
-    # Delete all contents of the destination directory if it exists
-    if os.path.exists(dst):
-        logging.info(f"Deleting contents of destination directory: {dst}")
-        shutil.rmtree(dst)
 
-    # Create the destination directory
-    os.makedirs(dst, exist_ok=True)
-    logging.info(f"Created destination directory: {dst}")
+# Block cache of the current worker process in parallel builds
+_worker_block_cache = None
 
-    # Recursively copy all files and subdirectories
-    for root, dirs, files in os.walk(src):
-        # Compute the relative path from the source directory
-        relative_path = os.path.relpath(root, src)
-        # Compute the corresponding destination path
-        dest_path = os.path.join(dst, relative_path)
+def _init_worker(block_cache_size: int, block_cache_path, block_cache_namespace: str = "", log_queue=None, log_level=logging.INFO):
+    """
+    Gives each worker process its own block cache, seeded from the persisted cache if there is one,
+    and sends its log records to the main process's log queue.
+    """
+    global _worker_block_cache
+    attach_worker(log_queue, log_level)
+    if block_cache_size > 0:
+        _worker_block_cache = BlockCache(block_cache_size, block_cache_path, namespace=block_cache_namespace)
 
-        # Create subdirectories in the destination directory
-        for dir_name in dirs:
-            dest_dir = os.path.join(dest_path, dir_name)
-            os.makedirs(dest_dir, exist_ok=True)
-            logging.info(f"Created directory: {dest_dir}")
 
-        # Copy files to the destination directory
-        for file_name in files:
-            src_file = os.path.join(root, file_name)
-            dest_file = os.path.join(dest_path, file_name)
-            shutil.copy2(src_file, dest_file)  # copy2 preserves metadata
-            logging.info(f"Copied file: {src_file} -> {dest_file}")
+def _generate_batch(batch: list, template_path: str, basepath, template=None, profile: bool = False, collect_links: bool = False, images=None) -> tuple:
+    """
+    Worker entry point for parallel builds. Generates every page in the batch and returns
+    a list of (markdown path, error message or None) so failures are reported per file,
+    along with the page profiles when profiling, the batch's output counts and, when
+    collecting links, the references of each page that succeeded.
+    """
+    results = []
+    profiler = BuildProfiler() if profile else None
+    writer = OutputWriter()
+    references = {}
+    for from_path, dest_path in batch:
+        page_references = [] if collect_links else None
+        try:
+            generate_page(from_path, template_path, dest_path, basepath, template, _worker_block_cache, profiler, writer, page_references, images)
+            results.append((from_path, None))
+        except Exception as e:
+            results.append((from_path, f"{type(e).__name__}: {e}"))
+            continue
+        if collect_links:
+            references[dest_path] = page_references
+    return results, profiler.pages if profiler is not None else [], writer.counts(), references
 
 
-def generate_page(from_path: str, template_path: str, dest_path: str, basepath):
+def generate_pages_parallel(pages: list, template_path: str, basepath, jobs: int, batch_size: int = 16, template=None, block_cache=None, profiler=None, progress=None, writer=None, links=None, images=None) -> list:
     """
-    Generates an HTML page from a markdown file using a template.
-    Replaces {{ Title }} and {{ Content }} placeholders in the template with the title and HTML content.
-    Writes the resulting HTML to the destination path.
+    Spreads page generation across a pool of worker processes in batches.
+    Each worker gets its own block cache with the same settings as the given one. Workers write
+    without a compressor, so the pages they produced are handed to this writer's compressor.
+    The link references of every page are added to the link index, if one is given.
+    Returns the list of (markdown path, error message) for every page that failed.
     """
-    # Print the generation message
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+    failures = []
+    cache_settings = (block_cache.maxsize, block_cache.path, block_cache.namespace) if block_cache is not None else (0, None, "")
+    log_settings = (get_log_queue(), logging.getLogger().level)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=cache_settings + log_settings) as executor:
+        futures = [executor.submit(_generate_batch, batch, template_path, basepath, template, profiler is not None, links is not None, images) for batch in batches]
+        for batch, future in zip(batches, futures):
+            results, page_profiles, counts, references = future.result()
+            if links is not None:
+                links.merge(references)
+            if profiler is not None:
+                profiler.merge(page_profiles)
+            if writer is not None:
+                writer.merge(counts)
+            if progress is not None:
+                progress.advance(len(results))
+            for (from_path, error), (_, dest_path) in zip(results, batch):
+                if error is not None:
+                    logging.error(f"Failed to generate page from {from_path}: {error}")
+                    failures.append((from_path, error))
+                elif writer is not None:
+                    writer.compress(dest_path)
+    return failures
 
-    # Read the markdown file
-    with open(from_path, "r", encoding="utf-8") as md_file:
-        markdown = md_file.read()
 
-    # Read the template file
-    with open(template_path, "r", encoding="utf-8") as template_file:
-        template = template_file.read()
+def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, basepath, manifest=None, jobs: int = 1, block_cache=None, profiler=None, progress_every: int = 100, writer=None, pipeline: bool = False, index=None, shard=None, links=None, images=None, assets=None):
+    """
+    Recursively crawls the content directory, finds all markdown files, and generates HTML files
+    in the public directory using the provided template. The directory structure is preserved.
+    With a build manifest, pages whose markdown, template and partials are unchanged are skipped.
+    With jobs > 1 the pages are rendered in parallel worker processes. With pipeline, a single
+    process overlaps reading and writing pages with rendering them in I/O threads (profiling
+    needs the per-page stages, so a profiled build does not pipeline).
+    A block cache is shared by every page of the build, and a profiler records every page.
+    Progress is logged every progress_every pages. An output writer counts the pages written and
+    left unchanged, and has every page marked as an output of the build. A source index of the
+    content directory saves scanning it again. With a shard, only that shard's share of the pages
+    is generated and a shard manifest is written next to them for the merge step.
+    A link index collects the links and images of every generated page. An image catalog adds
+    image dimensions to the pages; with a manifest, a page then also depends on its images.
+    An asset table has references to static files rewritten to their fingerprinted URLs; every
+    page then depends on the asset manifest, which changes whenever a fingerprint does.
+    """
+    if index is None:
+        index = SourceIndex.scan(dir_path_content)
+    pages = collect_pages(dir_path_content, dest_dir_path, index)
+    if shard is not None:
+        pages = shard.select(pages, index)
+        shard.clear_manifest(dest_dir_path)
+    # Compile the template once and share it across every page
+    template = load_template(template_path, basepath, assets)
+    # Every page depends on its markdown source, the template and any partial the template includes
+    shared_dependencies = template.dependencies + ([assets.path] if assets is not None and assets.path is not None else [])
+    dependencies = {dest: [src] + shared_dependencies for src, dest in pages}
+    if writer is None:
+        writer = OutputWriter()
+    for dest in dependencies:
+        writer.keep(dest)
+    page_dependencies = dependencies
+    if manifest is not None and images is not None:
+        if links is None:
+            links = LinkIndex(manifest.references)
+        # Images are tracked by size and mtime like every static file, so they are not hashed
+        for path, signature in images.signatures.items():
+            manifest.remember(path, signature)
+        # An unchanged page references the same images as last time, and a changed one is rebuilt anyway
+        dependencies = {dest: inputs + images.dependencies(manifest.references.get(dest, ())) for dest, inputs in page_dependencies.items()}
 
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown)
-    html_content = html_node.to_html()
+    def record(dest_path):
+        if images is not None:
+            # Recorded after rendering, so a page depends on the images it references now
+            dependencies[dest_path] = page_dependencies[dest_path] + images.dependencies(links.references.get(dest_path, ()))
+        manifest.record(dest_path, dependencies[dest_path])
 
-    # Extract the title
-    title = extract_title(markdown)
+    if manifest is not None:
+        outdated = manifest.outdated(dependencies)
+        if writer.compressor is not None:
+            # Skipped pages still get siblings if they have none yet; the hash cache makes this a stat
+            for _, dest in pages:
+                if dest not in outdated:
+                    writer.compress(dest)
+        pages = [(src, dest) for src, dest in pages if dest in outdated]
 
-    # Replace placeholders in the template
-    full_html = template.replace("{{ Title }}", title).replace("{{ Content }}", html_content).replace("href=\"/", f"href=\"{basepath}").replace("src=\"/", f"src=\"{basepath}")
+    progress = Progress("Pages", len(pages), progress_every)
+    if jobs <= 1 and not (pipeline and profiler is None):
+        for from_path, dest_path in pages:
+            references = [] if links is not None else None
+            generate_page(from_path, template_path, dest_path, basepath, template, block_cache, profiler, writer, references, images)
+            if links is not None:
+                links.set(dest_path, references)
+            if manifest is not None:
+                record(dest_path)
+            progress.advance()
+        progress.finish()
+    else:
+        # Only successful pages are recorded so failed ones are retried on the next build
+        if jobs > 1:
+            failures = generate_pages_parallel(pages, template_path, basepath, jobs, template=template, block_cache=block_cache, profiler=profiler, progress=progress, writer=writer, links=links, images=images)
+            failed = {from_path for from_path, _ in failures}
+            if manifest is not None:
+                for from_path, dest_path in pages:
+                    if from_path not in failed:
+                        record(dest_path)
+        else:
+            # The pipeline reports each page once its write succeeded
+            on_success = (lambda from_path, dest_path: record(dest_path)) if manifest is not None else None
+            failures = generate_pages_pipelined(pages, template, block_cache, writer, progress=progress, on_success=on_success, links=links, images=images)
+        progress.finish(f"{len(failures)} failed" if failures else "")
+        if failures:
+            raise RuntimeError(f"{len(failures)} of {len(pages)} pages failed to generate")
 
-    # Ensure the destination directory exists
-    dest_dir = os.path.dirname(dest_path)
-    os.makedirs(dest_dir, exist_ok=True)
+    if shard is not None:
+        # Only written once every page of the shard succeeded
+        settings = {
+            "basepath": basepath,
+            "template": template_hash(template.dependencies),
+            "assets": assets.version if assets is not None else None,
+            "images": images.namespace if images is not None else None,
+        }
+        shard.save_manifest(dest_dir_path, pages, links.references if links is not None else None, settings)
 
-    # Write the HTML to the destination file
-    with open(dest_path, "w", encoding="utf-8") as html_file:
-        html_file.write(full_html)
 
-    print(f"Page successfully generated at {dest_path}")
+def build(args):
+    """
+    Runs a build from the parsed command line arguments: the whole site, one shard of a
+    distributed build, or the merge of every shard's output. Returns the exit status:
+    1 if the link check found broken references, otherwise 0.
+    """
+    # Shards are not served, so only a merge or a whole-site build compresses
+    compressor = make_compressor(args) if not args.shard else None
+    writer = OutputWriter(compressor)
+    if not args.shard:
+        # Before anything is written, so an unrelated directory passed with -o is never pruned
+        writer.claim(args.output)
+    # One scandir pass per tree, or none when a persisted index shows the tree is unchanged
+    index_cache = load_index_cache(args.index) if args.index is not None else None
+    static_index = discover("static", index_cache)
+    content_index = discover("content", index_cache)
+    links = None
+    if args.merge:
+        links = build_merged(args, writer, static_index, content_index)
+    elif args.shard:
+        build_shard(args, writer, static_index, content_index)
+    else:
+        links = build_site(args, writer, static_index, content_index)
+    if index_cache is not None:
+        save_index_cache(args.index, index_cache)
+    if links is not None and args.check_links is not None:
+        return check_links(args, links, static_index, content_index)
+    return 0
 
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, basepath):
+def check_links(args, links, static_index, content_index) -> int:
     """
-    Recursively crawls the content directory, finds all markdown files, and generates HTML files
-    in the public directory using the provided template. The directory structure is preserved.
+    Resolves the links and images collected during the build against the generated pages and
+    the static files, logs and reports the broken ones, and returns the exit status.
     """
-    # Ensure the destination directory exists
-    os.makedirs(dest_dir_path, exist_ok=True)
+    pages = [dest for _, dest in collect_pages("content", args.output, content_index)]
+    static_files = [relative_path for relative_path, _, _ in static_index.files]
+    broken = links.check(args.output, pages, static_files)
+    report = links.report(broken, args.check_links)
+    logging.info(f"Links: {report['references']} references on {report['pages']} pages, {len(broken)} broken")
+    return 1 if broken else 0
 
-    # Iterate over all entries in the content directory
-    for entry in os.listdir(dir_path_content):
-        # Construct full paths
-        content_path = os.path.join(dir_path_content, entry)
-        dest_path = os.path.join(dest_dir_path, entry)
 
-        if os.path.isdir(content_path):
-            # If the entry is a directory, recursively process it
-            generate_pages_recursive(content_path, template_path, dest_path, basepath)
-        elif entry.endswith(".md"):
-            # If the entry is a markdown file, generate the corresponding HTML file
-            html_filename = os.path.splitext(entry)[0] + ".html"
-            html_dest_path = os.path.join(dest_dir_path, html_filename)
-            generate_page(content_path, template_path, html_dest_path, basepath)
+def catalog_images(args, static_index):
+    """
+    Reads the dimensions of the static images through the persistent image cache, creating
+    the missing variants, or returns None when images are not processed.
+    """
+    if not args.images and not args.image_widths:
+        return None
+    if args.image_widths and not RESIZE_SUPPORTED:
+        logging.warning("Pillow is not installed, so no image variants are generated")
+    cache = ImageCache(args.image_cache)
+    images = ImageCatalog.scan(static_index, cache, args.image_widths)
+    cache.save()
+    return images
 
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+def fingerprint_assets(args, static_index):
+    """
+    Fingerprints the static files through the persistent hash cache, or returns None when
+    assets are not fingerprinted.
+    """
+    if not args.fingerprint:
+        return None
+    hashes = HashCache.load(args.asset_cache)
+    assets = AssetTable.scan(static_index, hashes)
+    hashes.save(args.asset_cache)
+    return assets
+
+
+def make_compressor(args):
+    """
+    Returns the compressor for the formats asked for, or None when outputs are not compressed.
+    """
+    if not args.compress:
+        return None
+    formats = [fmt for fmt in dict.fromkeys(args.compress) if fmt != "br" or brotli is not None]
+    if len(formats) < len(set(args.compress)):
+        logging.warning("brotli is not installed, so no .br files are written")
+    if not formats:
+        return None
+    return Compressor(formats, args.compress_cache)
+
+
+def finish_outputs(writer, output_dir: str, manifest=None):
+    """
+    Removes the outputs of earlier builds that this one did not produce: through the manifest
+    for incremental builds, otherwise everything in the output directory not written or kept.
+    Pending compression is finished first, and siblings of removed outputs are deleted.
+    """
+    if writer.compressor is not None:
+        # Pruning must not see the temp files of siblings still being written
+        writer.compressor.wait()
+    if manifest is not None:
+        # Remove outputs whose source was deleted, then persist the hashes for the next run
+        removed = manifest.prune()
+        writer.count("deleted", len(removed))
+        manifest.save()
+    else:
+        # A full build leaves only what it produced in the output directory
+        removed = writer.prune(output_dir)
+    if writer.compressor is not None:
+        writer.compressor.close(removed)
+    if manifest is not None:
+        # Once the siblings are gone too, so directories that only held removed outputs are empty
+        remove_empty_parents(removed, output_dir)
+
+
+def build_shard(args, writer, static_index, content_index):
+    """
+    Renders one shard's pages into the output directory. Static files, fingerprinted assets and
+    image variants are placed by the merge. Link references always go into the shard manifest, so the merge can
+    check the whole site.
+    """
+    shard = Shard(*parse_shard(args.shard), args.shard_strategy)
+    images = catalog_images(args, static_index)
+    assets = fingerprint_assets(args, static_index)
+    generate_pages_recursive("content", "template.html", args.output, args.basepath, jobs=args.jobs, progress_every=args.progress_every,
+                             writer=writer, pipeline=args.pipeline, index=content_index, shard=shard, links=LinkIndex(), images=images, assets=assets)
+    logging.info(f"Shard {shard.index}/{shard.count}: {writer.written} written, {writer.unchanged} unchanged")
+
+
+def build_merged(args, writer, static_index, content_index):
+    """
+    Assembles the output directory from the shard directories of a distributed build.
+    Returns the link index gathered from the shard manifests.
+    """
+    pages = collect_pages("content", args.output, content_index)
+    links = LinkIndex()
+    merge_shards(args.merge, pages, args.output, writer, links)
+    sync_directory("static", args.output, None, args.checksum, args.link, writer, static_index)
+    images = catalog_images(args, static_index)
+    if images is not None:
+        images.place_variants(args.output, args.link, writer)
+    assets = fingerprint_assets(args, static_index)
+    if assets is not None:
+        assets.place("static", args.output, args.link, writer)
+        assets.save_manifest(args.output, writer)
+    finish_outputs(writer, args.output)
+    logging.info(f"Outputs: {writer.written} written, {writer.unchanged} unchanged, {writer.deleted} deleted")
+    return links
+
+
+def build_site(args, writer, static_index, content_index):
+    """
+    Builds the whole site into the output directory. Returns the link index of the site when
+    links are collected: always for incremental builds, whose manifest keeps the references of
+    pages that were not regenerated, otherwise only when checking links.
+    """
+    basepath = args.basepath
+    destination_dir = args.output
+    manifest = BuildManifest(args.manifest) if args.incremental else None
+    if manifest is not None:
+        links = LinkIndex(manifest.references)
     else:
-        basepath = "/"
-        
-    source_dir = "static"
-    destination_dir = "docs"
-    copy_directory(source_dir, destination_dir)
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+        links = LinkIndex() if args.check_links is not None else None
+    # Files already in place are left untouched, so their mtimes only change with their content
+    sync_directory("static", destination_dir, manifest, args.checksum, args.link, writer, static_index)
+    images = catalog_images(args, static_index)
+    if images is not None:
+        images.place_variants(destination_dir, args.link, writer, manifest)
+    assets = fingerprint_assets(args, static_index)
+    if assets is not None:
+        assets.place("static", destination_dir, args.link, writer, manifest)
+        assets.save_manifest(destination_dir, writer, manifest)
+    namespace = images.namespace if images is not None else ""
+    block_cache = BlockCache(args.block_cache_size, args.block_cache, namespace=namespace) if args.block_cache_size > 0 else None
+    profiler = BuildProfiler() if args.profile else None
+    generate_pages_recursive("content", "template.html", destination_dir, basepath, manifest, args.jobs, block_cache, profiler, args.progress_every, writer, args.pipeline, content_index,
+                             links=links, images=images, assets=assets)
+    if profiler is not None:
+        logging.info(profiler.summary_table())
+        profiler.save(args.profile)
+    if block_cache is not None and args.jobs <= 1:
+        # Worker processes keep their own caches, so only serial builds report and persist it
+        stats = block_cache.stats()
+        logging.info(f"Block cache: {stats['hits']} hits, {stats['misses']} misses")
+        if args.block_cache is not None:
+            block_cache.save()
+    finish_outputs(writer, destination_dir, manifest)
+    logging.info(f"Outputs: {writer.written} written, {writer.unchanged} unchanged, {writer.deleted} deleted")
+    return links
 
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the static site from content/ and static/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("--incremental", action="store_true", help="only rebuild outputs whose inputs changed")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes for page generation")
+    parser.add_argument("--pipeline", action="store_true", help="overlap reading and writing pages with rendering (single process); up to 16 pages are read ahead and 16 written behind, each held whole, so sources of 1 MiB or more are streamed in order instead")
+    parser.add_argument("--link", choices=LINK_MODES, default="copy", help="how static files are placed in the output directory; reflink copies with copy_file_range, which clones the blocks where the filesystem supports it and copies them otherwise")
+    parser.add_argument("--checksum", action="store_true", help="compare static files by content hash instead of size and mtime")
+    parser.add_argument("--block-cache-size", type=int, default=4096, help="rendered blocks to keep in memory (0 disables)")
+    parser.add_argument("--block-cache", default=None, help="file to persist the block cache between builds")
+    parser.add_argument("--profile", nargs="?", const="build_profile.json", default=None, metavar="REPORT",
+                        help="time each pipeline stage and write a JSON report (default build_profile.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every file and page")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+    parser.add_argument("--progress-every", type=int, default=100, help="log a progress line every N files")
+    parser.add_argument("--index", default=None, help="file to persist the content and static directory listings between builds")
+    parser.add_argument("-o", "--output", default="docs", help="output directory (default docs)")
+    parser.add_argument("--shard", default=None, metavar="I/N", help="only render shard I of N (1-based) and write a shard manifest")
+    parser.add_argument("--shard-strategy", choices=SHARD_STRATEGIES, default="hash",
+                        help="partition pages by path hash (stable) or balanced by file size")
+    parser.add_argument("--merge", nargs="+", default=None, metavar="SHARD_DIR",
+                        help="combine the output directories of every shard into the output directory")
+    parser.add_argument("--check-links", nargs="?", const="link_report.json", default=None, metavar="REPORT",
+                        help="check internal links and images after the build, write a JSON report (default link_report.json) and exit 1 if any are broken")
+    parser.add_argument("--images", action="store_true", help="add the width and height of static images to <img> tags")
+    parser.add_argument("--image-widths", type=int, nargs="+", default=(), metavar="WIDTH",
+                        help="also generate downscaled variants at these widths and add a srcset (needs Pillow; implies --images)")
+    parser.add_argument("--image-cache", default=".image_cache", help="directory caching image dimensions and variants between builds")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="copy static files as name.<hash>.ext, point pages at the copies and write an asset manifest")
+    parser.add_argument("--asset-cache", default=".asset_cache.json", help="file caching the content hashes of static files between builds")
+    parser.add_argument("--compress", choices=COMPRESSION_FORMATS, nargs="+", default=None, metavar="FORMAT",
+                        help="also write precompressed .gz (gzip) and/or .br (br, needs brotli) siblings of HTML, CSS and JS outputs")
+    parser.add_argument("--compress-cache", default=".compress_cache.json", help="file recording which outputs have up-to-date compressed siblings")
+    parser.add_argument("--manifest", default=".build_manifest.json", help="build manifest path for incremental builds")
+    args = parser.parse_args()
+    if args.shard is not None:
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.incremental or args.merge:
+            parser.error("--shard cannot be combined with --incremental or --merge")
+    if args.merge is not None and args.incremental:
+        parser.error("--merge cannot be combined with --incremental")
+    setup_logging(logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO)
+    try:
+        status = build(args)
+    finally:
+        # Flush any queued log records before exiting
+        stop_logging()
+    sys.exit(status)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import logging
+from depgraph import DependencyGraph
+
+
+def file_hash(path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """
+    Content hashes of files by path, reused while a file's size and mtime are unchanged, so a
+    file is only read again after it changed. Only the files looked up are kept when saving.
+    """
+    def __init__(self, files=None):
+        # Path -> [size, mtime_ns, content hash]
+        self.files = files if files is not None else {}
+        self.seen = set()
+        self.hashed = 0
+
+    def digest(self, path: str, size: int, mtime_ns: int) -> str:
+        self.seen.add(path)
+        record = self.files.get(path)
+        if record is not None and record[0] == size and record[1] == mtime_ns:
+            return record[2]
+        digest = file_hash(path)
+        self.files[path] = [size, mtime_ns, digest]
+        self.hashed += 1
+        return digest
+
+    def to_dict(self) -> dict:
+        return {path: record for path, record in self.files.items() if path in self.seen}
+
+    @classmethod
+    def load(cls, path: str):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+
+class BuildManifest:
+    """
+    Persistent record of which inputs produced each output file and the signature (content
+    hash) of every input at the time. Used by incremental builds to skip outputs whose inputs
+    are unchanged and to delete outputs whose source has disappeared since the previous build.
+    The output -> inputs edges form a dependency graph, so a changed input (a template or an
+    included partial) only invalidates the outputs that were actually built from it.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        # Input path -> signature recorded by the last build that used it
+        self.inputs = {}
+        # The signatures as loaded, which changed() compares against even after this build
+        # recorded new ones (an input can be shared, like an image synced and used by pages)
+        self.previous = {}
+        self.graph = DependencyGraph()
+        # Output path -> links and images on that page, kept so unchanged pages can still be link checked
+        self.references = {}
+        # Input path -> [size, mtime_ns] when it was last hashed; an input with the same stat
+        # is taken to be unchanged without reading it
+        self.stats = {}
+        self.seen = set()
+        self._hashes = {}
+        # Inputs read and hashed by this build
+        self.hashed = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Manifests from before the dependency graph have no "inputs" and start over
+            if "inputs" in data:
+                self.inputs = data["inputs"]
+                self.previous = dict(self.inputs)
+                self.graph = DependencyGraph.from_dict(data.get("outputs", {}))
+                self.references = data.get("references", {})
+                self.stats = data.get("stats", {})
+
+    def hash(self, path: str) -> str:
+        """
+        Returns the content hash of an input, once per build; shared inputs like the template
+        are only looked at once. An input whose size and mtime match the previous build keeps
+        its previous hash, so only the inputs that were touched are read.
+        """
+        if path not in self._hashes:
+            stat = os.stat(path)
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if self.stats.get(path) == signature and path in self.previous:
+                self._hashes[path] = self.previous[path]
+            else:
+                self._hashes[path] = file_hash(path)
+                self.hashed += 1
+            self.stats[path] = signature
+        return self._hashes[path]
+
+    def remember(self, path: str, signature):
+        """
+        Takes the signature of an input from a caller that already has one, instead of hashing
+        it. It has to be the signature other outputs record for that input, if any.
+        """
+        self._hashes[path] = signature
+
+    def changed(self, paths) -> set:
+        """
+        Returns the paths whose content hash differs from the one recorded by the previous build.
+        Only paths whose size or mtime changed are hashed.
+        """
+        return {path for path in paths if self.previous.get(path) != self.hash(path)}
+
+    def dirty(self, changed_paths) -> set:
+        """
+        Returns the recorded outputs built from any of the changed paths.
+        """
+        return self.graph.dirty(changed_paths)
+
+    def outdated(self, targets: dict) -> set:
+        """
+        Marks every output in targets (output -> inputs) as part of this build and returns the
+        ones to rebuild: new or missing outputs, outputs whose inputs differ from the previous
+        build, and every output the graph links to a changed input. Each distinct input is
+        checked once, however many outputs share it, and only hashed if its stat changed; the
+        dirty outputs come from the graph's reverse index, not from looking at every output's inputs.
+        """
+        self.seen.update(targets)
+        all_inputs = {path for inputs in targets.values() for path in inputs}
+        outdated = self.dirty(self.changed(all_inputs)) & targets.keys()
+        for output, inputs in targets.items():
+            if output not in outdated and (self.graph.inputs_of(output) != list(inputs) or not os.path.exists(output)):
+                outdated.add(output)
+        return outdated
+
+    def record(self, output: str, inputs, signature=None):
+        """
+        Stores the inputs of an output. By default they are content-hashed; callers with a
+        cheaper change check (like the static sync) can pass their own signature per input.
+        """
+        self.seen.add(output)
+        self.graph.set_inputs(output, inputs)
+        for path in inputs:
+            self.inputs[path] = signature[path] if signature is not None else self.hash(path)
+
+    def prune(self) -> list:
+        """
+        Deletes outputs recorded by a previous build that were not produced by this one,
+        and forgets inputs no remaining output depends on. Returns the list of removed paths.
+        """
+        removed = []
+        for output in sorted(set(self.graph.outputs()) - self.seen):
+            if os.path.exists(output):
+                os.remove(output)
+                logging.info(f"Removed stale output: {output}")
+            self.graph.remove_output(output)
+            self.references.pop(output, None)
+            removed.append(output)
+        for path in set(self.inputs) - set(self.graph.dependents):
+            del self.inputs[path]
+        for path in set(self.stats) - set(self.inputs):
+            del self.stats[path]
+        return removed
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"inputs": self.inputs, "outputs": self.graph.to_dict(), "references": self.references, "stats": self.stats}, f, indent=1, sort_keys=True)
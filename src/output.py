@@ -0,0 +1,205 @@
+import os
+import hashlib
+import logging
+import itertools
+import threading
+from manifest import file_hash
+
+# Written into output directories the build may prune, so a later build can tell its own
+# output directory from an unrelated one passed with -o
+BUILD_MARKER = ".site-build"
+BUILD_MARKER_TEXT = "Generated by the site build. Files here that the build does not produce are deleted.\n"
+
+# Distinguishes temp files of outputs written concurrently in the same process
+_temp_counter = itertools.count()
+
+
+def remove_empty_parents(paths, root: str) -> list:
+    """
+    Removes the directories under root left empty by deleting the given files, deepest first,
+    the way rsync --delete leaves no empty directories behind. root itself is kept. Returns
+    the removed directories.
+    """
+    root = os.path.abspath(root)
+    prefix = os.path.join(root, "")
+    directories = set()
+    for path in paths:
+        directory = os.path.dirname(os.path.abspath(path))
+        while directory.startswith(prefix) and directory not in directories:
+            directories.add(directory)
+            directory = os.path.dirname(directory)
+    removed = []
+    for directory in sorted(directories, key=lambda d: d.count(os.sep), reverse=True):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            continue  # Still has files, or is already gone
+        logging.debug(f"Removed empty directory: {directory}")
+        removed.append(directory)
+    return removed
+
+
+class AtomicOutput:
+    """
+    Writable stream for one output file. Text is encoded and hashed as it is written to a temp
+    file next to the destination; on close the temp file replaces the destination only if the
+    content differs from what is already there, otherwise it is discarded and the existing
+    file (and its mtime) is left alone. On error the destination is never touched.
+    """
+    def __init__(self, writer, path: str):
+        self.writer = writer
+        self.path = path
+        directory, name = os.path.split(path)
+        self.temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{next(_temp_counter)}.tmp")
+        self.fp = open(self.temp_path, "xb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.digest.update(data)
+        self.size += len(data)
+        self.fp.write(data)
+
+    def commit(self) -> bool:
+        """
+        Finishes the output and returns True if the destination was (re)written.
+        """
+        self.fp.close()
+        digest = self.digest.hexdigest()
+        if self.writer.matches(self.path, self.size, digest):
+            os.remove(self.temp_path)
+            self.writer.count("unchanged")
+            logging.debug(f"Unchanged output: {self.path}")
+            self.writer.compress(self.path, digest)
+            return False
+        os.replace(self.temp_path, self.path)
+        self.writer.count("written")
+        self.writer.compress(self.path, digest)
+        return True
+
+    def discard(self):
+        self.fp.close()
+        os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+class OutputWriter:
+    """
+    Writes build outputs atomically, skipping files whose content is already on disk so their
+    mtimes stay put and deploy tools only see the files that really changed. Keeps counts of
+    written, unchanged and deleted files and the set of outputs the build produced.
+    Outputs can be written from several threads at once. With a compressor, every output gets
+    precompressed siblings, made in the background.
+    """
+    def __init__(self, compressor=None):
+        self.written = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.seen = set()
+        # Output directories this build may prune
+        self.claimed = set()
+        self.compressor = compressor
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def open(self, path: str) -> AtomicOutput:
+        self.keep(path)
+        return AtomicOutput(self, path)
+
+    def write(self, path: str, text: str) -> bool:
+        output = self.open(path)
+        try:
+            output.write(text)
+        except BaseException:
+            output.discard()
+            raise
+        return output.commit()
+
+    def matches(self, path: str, size: int, digest: str) -> bool:
+        """
+        Reports whether the file at path already has the given content. The size is compared
+        first, so only files that might be identical are read and hashed.
+        """
+        try:
+            if os.path.getsize(path) != size:
+                return False
+        except OSError:
+            return False
+        return file_hash(path) == digest
+
+    def keep(self, path: str):
+        """
+        Marks a file as produced by this build, so prune leaves it in place.
+        """
+        self.seen.add(os.path.normpath(path))
+
+    def compress(self, path: str, digest=None):
+        """
+        Has the compressor make the siblings of a finished output, marking them as outputs too.
+        Files copied into place rather than written call this themselves; the digest is the
+        SHA-256 of the content when the caller has it.
+        """
+        if self.compressor is not None:
+            for sibling in self.compressor.submit(path, digest):
+                self.keep(sibling)
+
+    def claim(self, root: str) -> bool:
+        """
+        Checks, before anything is written, whether root may be pruned: it must not exist yet,
+        be empty or carry the marker of an earlier build. The marker is then written, so the
+        next build can prune it too. A directory with other files is never claimed.
+        """
+        try:
+            entries = os.listdir(root)
+        except FileNotFoundError:
+            entries = []
+        if entries and BUILD_MARKER not in entries:
+            logging.warning(f"{root} has files from somewhere else and no {BUILD_MARKER}, so no stale outputs are deleted from it")
+            return False
+        os.makedirs(root, exist_ok=True)
+        self.write(os.path.join(root, BUILD_MARKER), BUILD_MARKER_TEXT)
+        self.claimed.add(os.path.normpath(root))
+        return True
+
+    def prune(self, root: str) -> list:
+        """
+        Deletes every file under root that this build did not produce, and the directories
+        left empty. Returns the removed file paths. Only directories claimed at the start of
+        the build are pruned; for any other, nothing is deleted.
+        """
+        if os.path.normpath(root) not in self.claimed:
+            return []
+        removed = []
+        for dir_path, dir_names, file_names in os.walk(root, topdown=False):
+            for file_name in file_names:
+                path = os.path.normpath(os.path.join(dir_path, file_name))
+                if path not in self.seen:
+                    os.remove(path)
+                    logging.debug(f"Deleted stale output: {path}")
+                    removed.append(path)
+            if dir_path != root and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+        self.count("deleted", len(removed))
+        return sorted(removed)
+
+    def counts(self) -> dict:
+        return {"written": self.written, "unchanged": self.unchanged, "deleted": self.deleted}
+
+    def merge(self, counts: dict):
+        """
+        Adds the counts of a writer used in a worker process.
+        """
+        for name, n in counts.items():
+            self.count(name, n)
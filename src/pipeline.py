@@ -0,0 +1,131 @@
+import os
+import logging
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from blocks import *
+from output import OutputWriter
+from reader import MMAP_THRESHOLD, open_source
+
+
+def read_source(path: str, max_size: int = MMAP_THRESHOLD):
+    """
+    Returns the markdown of a page, or None for a source of at least max_size bytes, which is
+    streamed instead of being held whole.
+    """
+    with open(path, "r", encoding="utf-8") as md_file:
+        if os.fstat(md_file.fileno()).st_size >= max_size:
+            return None
+        return md_file.read()
+
+
+def render_page(markdown: str, template, block_cache=None, references=None, images=None) -> str:
+    """
+    Renders a page's markdown into the template, producing the same HTML as generate_page.
+    """
+    # Split like open_source splits the file
+    lines = markdown.splitlines()
+    title = extract_title_from_lines(lines)
+    content = itertools.chain(["<div>"], iter_html_blocks(lines, block_cache, references, images), ["</div>"])
+    return template.render({"Title": title, "Content": content})
+
+
+def stream_page(from_path: str, dest_path: str, template, block_cache=None, writer=None, references=None, images=None):
+    """
+    Renders a page block by block from its source straight into the output, like generate_page,
+    so only one block of a large page is held at a time.
+    """
+    with open_source(from_path) as md_file:
+        title, lines = split_title(md_file)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        content = itertools.chain(["<div>"], iter_html_blocks(lines, block_cache, references, images), ["</div>"])
+        with writer.open(dest_path) as html_file:
+            template.stream(html_file, {"Title": title, "Content": content})
+
+
+def write_page(writer: OutputWriter, dest_path: str, html: str) -> bool:
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    return writer.write(dest_path, html)
+
+
+def generate_pages_pipelined(pages: list, template, block_cache=None, writer=None, io_threads: int = 4, depth: int = 16, progress=None, on_success=None, links=None, images=None, stream_size: int = MMAP_THRESHOLD) -> list:
+    """
+    Generates pages with reading, rendering and writing overlapped: a pool of reader threads
+    prefetches the markdown of upcoming pages, the calling thread renders them in page order,
+    and a pool of writer threads flushes the finished pages. At most `depth` reads and `depth`
+    writes are in flight. Sources of stream_size bytes or more are not read ahead: they are
+    streamed into their output in the calling thread once the writes before them are done. So
+    the pages held in memory are a few dozen below that size, not whole large pages.
+    Pages complete in their original order; on_success(markdown path, html path) is called for
+    each page written successfully, and a link index gets the links and images of those pages.
+    An image catalog adds the dimensions of the images to their <img> tags.
+    Returns the list of (markdown path, error message) for
+    every page that failed.
+    """
+    if writer is None:
+        writer = OutputWriter()
+    failures = []
+    pending_pages = iter(pages)
+    reads = deque()
+    writes = deque()
+
+    def succeeded(from_path, dest_path, references):
+        logging.debug(f"Page successfully generated at {dest_path}")
+        if links is not None:
+            links.set(dest_path, references)
+        if on_success is not None:
+            on_success(from_path, dest_path)
+
+    def finish_write():
+        from_path, dest_path, references, future = writes.popleft()
+        try:
+            future.result()
+        except Exception as e:
+            logging.error(f"Failed to write page from {from_path}: {e}")
+            failures.append((from_path, f"{type(e).__name__}: {e}"))
+        else:
+            succeeded(from_path, dest_path, references)
+        if progress is not None:
+            progress.advance()
+
+    with ThreadPoolExecutor(io_threads, thread_name_prefix="read") as readers, ThreadPoolExecutor(io_threads, thread_name_prefix="write") as writers:
+        for from_path, dest_path in itertools.islice(pending_pages, depth):
+            reads.append((from_path, dest_path, readers.submit(read_source, from_path, stream_size)))
+
+        while reads:
+            from_path, dest_path, future = reads.popleft()
+            # Keep the read-ahead window full while this page renders
+            for next_from, next_dest in itertools.islice(pending_pages, 1):
+                reads.append((next_from, next_dest, readers.submit(read_source, next_from, stream_size)))
+            references = [] if links is not None else None
+            try:
+                markdown = future.result()
+                if markdown is None:
+                    # Earlier pages complete first, so pages still finish in order
+                    while writes:
+                        finish_write()
+                    stream_page(from_path, dest_path, template, block_cache, writer, references, images)
+                    html = None
+                else:
+                    html = render_page(markdown, template, block_cache, references, images)
+            except Exception as e:
+                logging.error(f"Failed to generate page from {from_path}: {e}")
+                failures.append((from_path, f"{type(e).__name__}: {e}"))
+                if progress is not None:
+                    progress.advance()
+                continue
+            if html is None:
+                # Streamed straight into its output, so it is already written
+                succeeded(from_path, dest_path, references)
+                if progress is not None:
+                    progress.advance()
+                continue
+            writer.keep(dest_path)
+            writes.append((from_path, dest_path, references, writers.submit(write_page, writer, dest_path, html)))
+            # Wait for the oldest write once the window is full, so rendering never runs far ahead
+            while len(writes) > depth:
+                finish_write()
+
+        while writes:
+            finish_write()
+    return failures
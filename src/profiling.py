@@ -0,0 +1,210 @@
+import os
+import json
+import time
+from blocks import *
+
+# Pipeline stages in the order they run for a page; "other" is the part of a page's time
+# outside every measured stage (opening files, creating directories)
+STAGES = ("read", "split", "classify", "inline", "tree", "to_html", "template", "write", "other")
+
+
+class PageProfile:
+    """
+    Wall time per pipeline stage, bytes in and out and node counts for one generated page.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.total = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.blocks = 0
+        self.nodes = 0
+        self.cache_hits = 0
+        # Time the profiler itself spent (counting the nodes of cached blocks), left out of every stage
+        self.untimed = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "total": self.total,
+            "stages": self.stages,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "blocks": self.blocks,
+            "nodes": self.nodes,
+            "cache_hits": self.cache_hits,
+        }
+
+
+def count_nodes(node) -> int:
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_nodes(child) for child in children)
+
+
+def timed_lines(lines, profile: PageProfile):
+    """
+    Passes lines through, counting the time spent getting each one from the source as "read".
+    """
+    lines = iter(lines)
+    stages = profile.stages
+    while True:
+        started = time.perf_counter()
+        line = next(lines, None)
+        stages["read"] += time.perf_counter() - started
+        if line is None:
+            return
+        yield line
+
+
+def profiled_html_blocks(lines, profile: PageProfile, block_cache=None, references=None, images=None):
+    """
+    Same output as blocks.iter_html_blocks, timing each stage into the page profile: reading
+    lines, splitting them into blocks, classifying, inline parsing, building the block's tree
+    and rendering it.
+    """
+    stages = profile.stages
+
+    def to_children(text, references=None, images=None):
+        started = time.perf_counter()
+        children = text_to_children(text, references, images)
+        stages["inline"] += time.perf_counter() - started
+        return children
+
+    split = iter_block_lines(timed_lines(lines, profile))
+    while True:
+        read_before = stages["read"]
+        started = time.perf_counter()
+        split_block = next(split, None)
+        split_done = time.perf_counter()
+        stages["split"] += split_done - started - (stages["read"] - read_before)
+        if split_block is None:
+            return
+        profile.blocks += 1
+
+        block = type_block(*split_block)
+        stages["classify"] += time.perf_counter() - split_done
+        entry = block_cache.lookup(block.text) if block_cache is not None else None
+        if entry is not None:
+            profile.cache_hits += 1
+            count = entry[2]
+            if count is None:
+                # Rendered without the profiler; the tree is built only to be counted, and the
+                # count is kept in the cache entry for the next hit
+                started = time.perf_counter()
+                count = count_nodes(block.to_html_node(None, images))
+                block_cache.put(block.text, entry[0], entry[1], count)
+                profile.untimed += time.perf_counter() - started
+            profile.nodes += count
+            if references is not None:
+                references.extend(entry[1])
+            yield entry[0]
+            continue
+
+        inline_before = stages["inline"]
+        started = time.perf_counter()
+        block_references = [] if block_cache is not None or references is not None else None
+        node = block_to_html_node(block.text, block.block_type, block.lines, block_references, images, to_children)
+        converted = time.perf_counter()
+        html = node.to_html()
+        stages["tree"] += converted - started - (stages["inline"] - inline_before)
+        stages["to_html"] += time.perf_counter() - converted
+        count = count_nodes(node)
+        profile.nodes += count
+        if block_cache is not None:
+            block_cache.put(block.text, html, block_references, count)
+        if references is not None:
+            references.extend(block_references)
+        yield html
+
+
+def profiled_stream(template, fp, values: dict, profile: PageProfile):
+    """
+    Streams a page through the template into fp (a TimedWriter). The content is rendered
+    while the template pulls it, so "template" is the time of the whole stream minus the
+    stages timed inside it.
+    """
+    before = sum(profile.stages.values()) + profile.untimed
+    started = time.perf_counter()
+    template.stream(fp, values)
+    elapsed = time.perf_counter() - started
+    profile.stages["template"] += elapsed - (sum(profile.stages.values()) + profile.untimed - before)
+
+
+class TimedWriter:
+    """
+    Wraps an output file, recording the time spent writing and the number of bytes written.
+    """
+    def __init__(self, fp, profile: PageProfile):
+        self.fp = fp
+        self.profile = profile
+
+    def write(self, text: str):
+        started = time.perf_counter()
+        self.fp.write(text)
+        self.profile.stages["write"] += time.perf_counter() - started
+        self.profile.bytes_out += len(text.encode("utf-8"))
+
+
+class BuildProfiler:
+    """
+    Collects page profiles for a build and reports aggregate stage times and the slowest pages.
+    """
+    def __init__(self):
+        self.pages = []
+
+    def page(self, path: str) -> PageProfile:
+        profile = PageProfile(path)
+        profile.bytes_in = os.path.getsize(path)
+        return profile
+
+    def add(self, profile: PageProfile):
+        # The profiler's own work is not part of the page's time
+        profile.total -= profile.untimed
+        measured = sum(value for stage, value in profile.stages.items() if stage != "other")
+        profile.stages["other"] = max(profile.total - measured, 0.0)
+        self.pages.append(profile.to_dict())
+
+    def merge(self, page_dicts):
+        """
+        Adds page profiles recorded in worker processes.
+        """
+        self.pages.extend(page_dicts)
+
+    def report(self, slowest: int = 10) -> dict:
+        stages = dict.fromkeys(STAGES, 0.0)
+        for page in self.pages:
+            for stage, value in page["stages"].items():
+                stages[stage] += value
+        return {
+            "pages": len(self.pages),
+            "total": sum(page["total"] for page in self.pages),
+            "stages": stages,
+            "bytes_in": sum(page["bytes_in"] for page in self.pages),
+            "bytes_out": sum(page["bytes_out"] for page in self.pages),
+            "nodes": sum(page["nodes"] for page in self.pages),
+            "slowest": sorted(self.pages, key=lambda page: page["total"], reverse=True)[:slowest],
+        }
+
+    def summary_table(self, slowest: int = 10) -> str:
+        report = self.report(slowest)
+        total = report["total"] or 1.0
+        lines = [
+            f"Profiled {report['pages']} pages in {report['total']:.3f}s "
+            f"({report['bytes_in']} bytes in, {report['bytes_out']} bytes out, {report['nodes']} nodes)",
+            f"{'stage':<10} {'seconds':>10} {'share':>7}",
+        ]
+        for stage, value in report["stages"].items():
+            lines.append(f"{stage:<10} {value:>10.4f} {value / total:>7.1%}")
+        lines.append("Slowest pages:")
+        for page in report["slowest"]:
+            lines.append(f"{page['total']:>10.4f}s  {page['path']}")
+        return "\n".join(lines)
+
+    def save(self, path: str, slowest: int = 10):
+        report = self.report(slowest)
+        report["all_pages"] = self.pages
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
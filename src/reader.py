@@ -0,0 +1,83 @@
+import os
+import mmap
+import contextlib
+from itertools import chain
+
+# Sources at least this large are memory-mapped instead of read through a buffered text file
+MMAP_THRESHOLD = 1 << 20
+# Bytes decoded at a time; chunks end on a line boundary
+CHUNK_SIZE = 1 << 18
+# Mapped pages already read are released after this many bytes, so they do not add up in RSS
+RELEASE_EVERY = 1 << 22
+
+
+class MappedSource:
+    """
+    Lines of a UTF-8 file read through a memory map, without their line endings. The file is
+    decoded one chunk at a time as the lines are consumed, so only the current chunk is held as
+    text however large the file is, and the pages of the map already read are handed back to the
+    OS. Lines are split like str.splitlines() splits the whole text: on "\\n", "\\r\\n" and "\\r",
+    and also on form feeds, vertical tabs and the other Unicode line boundaries.
+    """
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, "rb")
+        self._map = None
+        if os.fstat(self._file.fileno()).st_size > 0:
+            # Empty files cannot be mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __iter__(self):
+        # Lines are handed out by chain, so iterating costs no Python-level step per line
+        return chain.from_iterable(self._chunks())
+
+    def _chunks(self):
+        # Yields the lines of each decoded chunk as a list
+        data = self._map
+        if data is None:
+            return
+        size = len(data)
+        position = 0
+        released = 0
+        while position < size:
+            end = data.rfind(b"\n", position, position + self.chunk_size)
+            if end == -1:
+                # A line longer than a chunk is decoded whole
+                end = data.find(b"\n", position + self.chunk_size)
+            end = size if end == -1 else end + 1
+            # Chunks end after a "\n", so no line boundary ("\r\n" included) spans two of them
+            yield data[position:end].decode("utf-8").splitlines()
+            position = end
+            if hasattr(mmap, "MADV_DONTNEED") and position - released >= RELEASE_EVERY:
+                # madvise needs a page-aligned start and only whole pages can be dropped
+                start = released - released % mmap.PAGESIZE
+                length = position - start - (position - start) % mmap.PAGESIZE
+                self._map.madvise(mmap.MADV_DONTNEED, start, length)
+                released = start + length
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def open_source(path: str, mmap_threshold: int = MMAP_THRESHOLD):
+    """
+    Opens a markdown source for reading line by line: large files through a memory map, small
+    ones (or any file, with no threshold) read whole, which has less setup per file. Either way
+    the result is a context manager iterating over the lines without their line endings, split
+    like str.splitlines(), so the blocks match markdown_to_blocks on the same text.
+    """
+    if mmap_threshold is not None and os.path.getsize(path) >= mmap_threshold:
+        return MappedSource(path)
+    with open(path, "r", encoding="utf-8") as md_file:
+        return contextlib.nullcontext(md_file.read().splitlines())
@@ -0,0 +1,260 @@
+import os
+import html
+import time
+import logging
+import argparse
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from blocks import *
+from template import load_template, file_versions
+from depgraph import DependencyGraph
+from discovery import SourceIndex
+from watcher import watch_tree
+
+
+class SiteCache:
+    """
+    Keeps every page of the site rendered in memory for the dev server.
+    The parsed block trees of each page are cached, so a markdown edit only re-parses that
+    page and a template or partial edit re-renders the pages using it from their cached trees
+    without re-parsing.
+    """
+    def __init__(self, content_dir: str, template_path: str, basepath="/"):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.basepath = basepath
+        self.template = None
+        self.template_dependencies = []
+        self.template_versions = None
+        # Markdown path -> the markdown, template and partials its page was rendered from
+        self.graph = DependencyGraph()
+        # Markdown path -> (mtime_ns, title, block nodes)
+        self.trees = {}
+        # URL path ("/blog/tom/index.html") -> rendered page bytes
+        self.pages = {}
+        # Markdown path -> mtime_ns of pages that failed to render, retried once they change
+        self.failed = {}
+        # Message of the last template error, so a broken template is only reported once
+        self.template_error = None
+        # Markdown path -> mtime_ns as last seen, or None until the content directory is scanned
+        self.files = None
+
+    def url_for(self, md_path: str) -> str:
+        relative_path = os.path.relpath(md_path, self.content_dir)
+        return "/" + os.path.splitext(relative_path)[0].replace(os.sep, "/") + ".html"
+
+    def scan(self) -> dict:
+        """
+        Returns the mtime of every markdown file under the content directory.
+        """
+        index = SourceIndex.scan(self.content_dir)
+        return {index.path(relative_path): mtime_ns for relative_path, _, mtime_ns in index.files if relative_path.endswith(".md")}
+
+    def update_files(self, paths) -> set:
+        """
+        Updates the known markdown files from the paths a watcher reported, without scanning
+        the content directory, and returns the markdown paths that may have changed.
+        A path that is gone may have been a directory, so the files under it are dropped too.
+        """
+        affected = set()
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                prefix = os.path.join(path, "")
+                removed = [md_path for md_path in self.files if md_path == path or md_path.startswith(prefix)]
+                for md_path in removed:
+                    del self.files[md_path]
+                affected.update(removed)
+                affected.add(path)
+                continue
+            if path.endswith(".md") and not os.path.isdir(path):
+                self.files[path] = stat.st_mtime_ns
+                affected.add(path)
+        return affected
+
+    def parse(self, md_path: str, mtime_ns: int):
+        with open(md_path, "r", encoding="utf-8") as md_file:
+            markdown = md_file.read()
+        title = extract_title(markdown)
+        nodes = [block.to_html_node() for block in markdown_to_typed_blocks(markdown)]
+        self.trees[md_path] = (mtime_ns, title, nodes)
+
+    def render(self, md_path: str):
+        _, title, nodes = self.trees[md_path]
+        content = "<div>" + "".join(node.to_html() for node in nodes) + "</div>"
+        html = self.template.render({"Title": title, "Content": content})
+        self.pages[self.url_for(md_path)] = html.encode("utf-8")
+
+    def refresh(self, paths=None) -> list:
+        """
+        Brings the cache up to date with the files on disk and returns the URLs that changed.
+        Changed markdown files and template partials are looked up in the dependency graph,
+        so only the pages built from them are re-rendered. With the paths a watcher reported
+        as changed, only those are checked instead of scanning the content directory.
+        """
+        changed_paths = set()
+        try:
+            template_versions = file_versions(self.template.dependencies) if self.template is not None else None
+        except FileNotFoundError:
+            template_versions = None
+        if template_versions is None or template_versions != self.template_versions:
+            try:
+                template = load_template(self.template_path, self.basepath)
+            except Exception as e:
+                # Editors often save by replacing the file, so it can be missing for a moment;
+                # the last good template keeps serving and the next poll tries again
+                message = f"{type(e).__name__}: {e}"
+                if message != self.template_error:
+                    logging.error(f"Failed to load template {self.template_path}: {message}")
+                    self.template_error = message
+                if self.template is None:
+                    # Nothing could be rendered, so the first good template rescans everything
+                    self.files = None
+                    return []
+            else:
+                self.template_error = None
+                self.template = template
+                previous = dict(zip(self.template_dependencies, self.template_versions or ()))
+                self.template_versions = file_versions(self.template.dependencies)
+                self.template_dependencies = list(self.template.dependencies)
+                for path, version in zip(self.template_dependencies, self.template_versions):
+                    if previous.get(path) != version:
+                        changed_paths.add(path)
+                # Partials that are no longer included affect the pages that used to include them
+                changed_paths.update(set(previous) - set(self.template_dependencies))
+
+        if paths is None or self.files is None:
+            self.files = self.scan()
+            candidates = set(self.files) | set(self.trees) | set(self.failed)
+        else:
+            candidates = self.update_files(paths)
+        found = self.files
+        changed = []
+        for md_path in {md_path for md_path in candidates if md_path not in found and (md_path in self.trees or md_path in self.failed)}:
+            # The markdown file was deleted
+            self.trees.pop(md_path, None)
+            self.failed.pop(md_path, None)
+            self.graph.remove_output(md_path)
+            self.pages.pop(self.url_for(md_path), None)
+            changed.append(self.url_for(md_path))
+
+        stale = {
+            md_path for md_path in candidates
+            if md_path in found and (self.trees[md_path][0] if md_path in self.trees else self.failed.get(md_path)) != found[md_path]
+        }
+        dirty = stale | (self.graph.dirty(changed_paths) & found.keys())
+        for md_path in dirty:
+            # Failed pages depend on the template too, so fixing it retries them
+            self.graph.set_inputs(md_path, [md_path] + self.template.dependencies)
+            try:
+                if md_path in stale or md_path not in self.trees:
+                    self.parse(md_path, found[md_path])
+                self.render(md_path)
+            except Exception as e:
+                logging.error(f"Failed to render {md_path}: {e}")
+                self.trees.pop(md_path, None)
+                # Not retried until the markdown or the template changes again
+                self.failed[md_path] = found[md_path]
+                self.pages[self.url_for(md_path)] = f"<pre>{html.escape(f'{type(e).__name__}: {e}')}</pre>".encode("utf-8")
+                continue
+            self.failed.pop(md_path, None)
+            changed.append(self.url_for(md_path))
+        return sorted(changed)
+
+    def lookup(self, url_path: str):
+        """
+        Returns the in-memory page for a request path, trying the index.html and .html forms.
+        """
+        url_path = url_path.split("?", 1)[0].split("#", 1)[0]
+        if url_path.endswith("/"):
+            candidates = [url_path + "index.html"]
+        else:
+            candidates = [url_path, url_path + ".html", url_path + "/index.html"]
+        for candidate in candidates:
+            if candidate in self.pages:
+                return self.pages[candidate]
+        return None
+
+
+def watch(site: SiteCache, interval: float, stop: threading.Event, watcher=None):
+    """
+    Polls the content directory and template, re-rendering affected pages until stopped.
+    With a watcher on the content directory, a change is picked up as soon as it happens
+    and only the paths it reports are looked at; the template is still checked every interval.
+    """
+    while not stop.is_set():
+        if watcher is not None:
+            paths = watcher.wait(interval)
+        elif stop.wait(interval):
+            break
+        else:
+            paths = None
+        try:
+            changed = site.refresh(paths)
+        except Exception:
+            # Keep watching; the pages already rendered stay served
+            logging.exception("Failed to refresh the site")
+            continue
+        for url in changed:
+            logging.info(f"Rebuilt {url}")
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves rendered pages from the site cache and everything else from the static directory.
+    """
+    def __init__(self, *args, site=None, **kwargs):
+        self.site = site
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        page = self.site.lookup(self.path)
+        if page is None:
+            return super().do_GET()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+def make_server(site: SiteCache, static_dir: str, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    handler = partial(DevRequestHandler, site=site, directory=static_dir)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Serve the site from memory and re-render pages as files change.")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between file system polls")
+    parser.add_argument("--content", default="content")
+    parser.add_argument("--static", default="static")
+    parser.add_argument("--template", default="template.html")
+    parser.add_argument("--poll", action="store_true", help="scan the content directory every interval instead of using inotify")
+    args = parser.parse_args()
+
+    site = SiteCache(args.content, args.template)
+    # Watching starts before the first render, so no edit in between is missed
+    watcher = watch_tree(args.content) if not args.poll else None
+    started = time.perf_counter()
+    site.refresh()
+    logging.info(f"Rendered {len(site.pages)} pages in {time.perf_counter() - started:.2f}s")
+
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(site, args.interval, stop, watcher), daemon=True).start()
+    server = make_server(site, args.static, args.port)
+    logging.info(f"Serving on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
@@ -0,0 +1,170 @@
+import os
+import json
+import heapq
+import hashlib
+import logging
+from manifest import file_hash
+
+SHARD_STRATEGIES = ("hash", "size")
+# Written into each shard's output directory
+SHARD_MANIFEST = "shard.json"
+
+
+def parse_shard(value: str) -> tuple:
+    """
+    Parses "i/N" (1-based) into (i, N).
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard: {value!r}, expected i/N")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard: {value!r}, i must be between 1 and N")
+    return index, count
+
+
+def partition(entries: list, count: int, strategy: str = "hash") -> list:
+    """
+    Deterministically splits (relative path, size) entries into count lists.
+    "hash" places each path by a hash of its name, so a page stays on the same shard as the
+    site grows. "size" balances the total bytes per shard by assigning the largest files
+    first to the least loaded shard.
+    """
+    shards = [[] for _ in range(count)]
+    if strategy == "hash":
+        for relative_path, size in entries:
+            digest = hashlib.blake2b(relative_path.replace(os.sep, "/").encode("utf-8"), digest_size=8).digest()
+            shards[int.from_bytes(digest, "big") % count].append(relative_path)
+    elif strategy == "size":
+        loads = [(0, shard) for shard in range(count)]
+        for relative_path, size in sorted(entries, key=lambda entry: (-entry[1], entry[0])):
+            load, shard = heapq.heappop(loads)
+            shards[shard].append(relative_path)
+            heapq.heappush(loads, (load + size, shard))
+    else:
+        raise ValueError(f"Invalid shard strategy: {strategy}")
+    return [sorted(shard) for shard in shards]
+
+
+def template_hash(paths) -> str:
+    """
+    Hashes a template together with the partials it includes, in order.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(file_hash(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+class Shard:
+    """
+    One shard of a distributed build: which of the content directory's pages it renders,
+    and the manifest it leaves behind for the merge step.
+    """
+    def __init__(self, index: int, count: int, strategy: str = "hash"):
+        self.index = index
+        self.count = count
+        self.strategy = strategy
+
+    def select(self, pages: list, content_index) -> list:
+        """
+        Returns the (markdown path, html path) pairs of this shard, in their original order.
+        """
+        sizes = {relative_path: size for relative_path, size, _ in content_index.files}
+        relative_paths = [os.path.relpath(src, content_index.root) for src, _ in pages]
+        entries = [(relative_path, sizes.get(relative_path, 0)) for relative_path in relative_paths]
+        selected = set(partition(entries, self.count, self.strategy)[self.index - 1])
+        return [page for page, relative_path in zip(pages, relative_paths) if relative_path in selected]
+
+    def clear_manifest(self, output_dir: str):
+        """
+        Removes the manifest of a previous run, so a shard that fails this time cannot be merged.
+        """
+        path = os.path.join(output_dir, SHARD_MANIFEST)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def save_manifest(self, output_dir: str, pages: list, references=None, settings=None):
+        """
+        Records the pages this shard rendered with the hash of each page's markdown,
+        so the merge can tell a shard built from an older tree, and the link references
+        of each page so the merged site can be link checked. The settings every page was
+        rendered with (basepath, template hash) must be the same on every shard.
+        """
+        manifest = {
+            "shard": self.index,
+            "count": self.count,
+            "strategy": self.strategy,
+            "settings": settings or {},
+            "pages": {os.path.relpath(dest, output_dir): file_hash(src) for src, dest in pages},
+            "references": {os.path.relpath(dest, output_dir): page_references for dest, page_references in (references or {}).items()},
+        }
+        with open(os.path.join(output_dir, SHARD_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def merge_shards(shard_dirs: list, pages: list, output_dir: str, writer, links=None) -> int:
+    """
+    Copies the pages rendered by every shard into output_dir through the output writer.
+    Before anything is copied, checks that all N shards are present and agree on N, and that
+    every page of the content directory was rendered by exactly one shard from the current
+    markdown, with the same basepath and template. Raises RuntimeError describing what is
+    missing or differs. Returns the number of pages.
+    The shards' link references are added to the link index, if one is given.
+    """
+    manifests = []
+    for shard_dir in shard_dirs:
+        path = os.path.join(shard_dir, SHARD_MANIFEST)
+        if not os.path.exists(path):
+            raise RuntimeError(f"No shard manifest in {shard_dir}; did that shard finish?")
+        with open(path, "r", encoding="utf-8") as f:
+            manifests.append((shard_dir, json.load(f)))
+
+    counts = {manifest["count"] for _, manifest in manifests}
+    if len(counts) != 1:
+        raise RuntimeError(f"Shards disagree on the shard count: {sorted(counts)}")
+    count = counts.pop()
+    present = sorted(manifest["shard"] for _, manifest in manifests)
+    if present != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(present))
+        raise RuntimeError(f"Expected shards 1..{count}, missing {missing}, got {present}")
+    settings = {}
+    for _, manifest in manifests:
+        for name, value in manifest.get("settings", {}).items():
+            settings.setdefault(name, {}).setdefault(value, []).append(manifest["shard"])
+    for name, values in sorted(settings.items()):
+        if len(values) > 1 or sum(len(shards) for shards in values.values()) < len(manifests):
+            described = "; ".join(f"{value!r} on shards {sorted(shards)}" for value, shards in values.items())
+            raise RuntimeError(f"Shards were built with different {name} settings: {described}")
+
+    # Relative html path -> (shard directory, markdown hash)
+    rendered = {}
+    for shard_dir, manifest in manifests:
+        for relative_path, digest in manifest["pages"].items():
+            if relative_path in rendered:
+                raise RuntimeError(f"{relative_path} was rendered by more than one shard")
+            rendered[relative_path] = (shard_dir, digest)
+
+    problems = []
+    for src, dest in pages:
+        relative_path = os.path.relpath(dest, output_dir)
+        if relative_path not in rendered:
+            problems.append(f"missing {relative_path}")
+        elif rendered[relative_path][1] != file_hash(src):
+            problems.append(f"stale {relative_path} (built from an older {src})")
+        elif not os.path.exists(os.path.join(rendered[relative_path][0], relative_path)):
+            problems.append(f"missing output {os.path.join(rendered[relative_path][0], relative_path)}")
+    if problems:
+        raise RuntimeError(f"Shards are incomplete, {len(problems)} problems: " + "; ".join(problems[:10]))
+
+    for src, dest in pages:
+        relative_path = os.path.relpath(dest, output_dir)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(os.path.join(rendered[relative_path][0], relative_path), "r", encoding="utf-8", newline="") as f:
+            writer.write(dest, f.read())
+    if links is not None:
+        for _, manifest in manifests:
+            for relative_path, page_references in manifest.get("references", {}).items():
+                links.set(os.path.join(output_dir, relative_path), page_references)
+    logging.info(f"Merged {len(pages)} pages from {count} shards")
+    return len(pages)
@@ -0,0 +1,115 @@
+import os
+import shutil
+import logging
+from manifest import file_hash
+from discovery import SourceIndex
+
+# "reflink" asks the kernel to copy with copy_file_range, which clones the blocks on filesystems
+# that support it (Btrfs, XFS with reflink) and copies them in the kernel elsewhere
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+
+def stat_signature(path: str) -> dict:
+    """
+    Cheap change signature for a static file: its size and modification time.
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_unchanged(src_file: str, dest_file: str, checksum: bool = False, src_signature=None) -> bool:
+    """
+    rsync-style quick check: the destination is up to date when its size and mtime match the
+    source. With checksum, files of equal size are compared by content hash instead of mtime.
+    A known stat signature of the source saves stat'ing it again.
+    """
+    try:
+        dest_stat = os.stat(dest_file)
+    except FileNotFoundError:
+        return False
+    if src_signature is None:
+        src_signature = stat_signature(src_file)
+    if src_signature["size"] != dest_stat.st_size:
+        return False
+    if checksum:
+        return file_hash(src_file) == file_hash(dest_file)
+    return src_signature["mtime_ns"] == dest_stat.st_mtime_ns
+
+
+def _copy_range(src_file: str, dest_file: str):
+    """
+    Copies with copy_file_range, then the metadata like copy2. The kernel may clone the blocks
+    (a reflink) but does not promise to; either way the bytes never pass through user space.
+    """
+    with open(src_file, "rb") as src, open(dest_file, "wb") as dest:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dest.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    shutil.copystat(src_file, dest_file)
+
+
+def place_file(src_file: str, dest_file: str, link_mode: str = "copy"):
+    """
+    Puts a copy of src_file at dest_file using the requested link mode, falling back to a
+    regular copy when the filesystem does not support it.
+    """
+    # Never write through an existing file: it may be a hardlink to the source
+    if os.path.lexists(dest_file):
+        os.remove(dest_file)
+    try:
+        if link_mode == "hardlink":
+            os.link(src_file, dest_file)
+            return
+        if link_mode == "reflink":
+            _copy_range(src_file, dest_file)
+            return
+    except (OSError, AttributeError) as e:
+        logging.debug(f"{link_mode} failed for {src_file}, copying instead: {e}")
+    shutil.copy2(src_file, dest_file)  # copy2 preserves metadata
+
+
+def sync_directory(src: str, dst: str, manifest=None, checksum: bool = False, link_mode: str = "copy", writer=None, index=None) -> dict:
+    """
+    Incrementally mirrors the source directory into the destination directory.
+    Only new or changed files are copied and nothing else in the destination is touched, so
+    generated HTML living alongside the static files is kept. With a build manifest, files
+    synced by a previous build whose source is gone are removed when the manifest is pruned.
+    With an output writer, every synced file is marked as an output of the build (and compressed,
+    if the writer has a compressor).
+    An existing source index of src is used instead of scanning it again.
+    Returns counts of copied and unchanged files.
+    """
+    # Ensure the source directory exists
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"Source directory '{src}' does not exist.")
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Invalid link mode: {link_mode}")
+    if index is None:
+        index = SourceIndex.scan(src)
+
+    for relative_path in index.directories:
+        os.makedirs(os.path.normpath(os.path.join(dst, relative_path)), exist_ok=True)
+
+    counts = {"copied": 0, "unchanged": 0}
+    for relative_path, size, mtime_ns in index.files:
+        src_file = os.path.join(src, relative_path)
+        dest_file = os.path.normpath(os.path.join(dst, relative_path))
+        # A freshly scanned index already has the source's stat; a reused one may be out of date
+        signature = {"size": size, "mtime_ns": mtime_ns} if index.fresh else stat_signature(src_file)
+        if is_unchanged(src_file, dest_file, checksum, signature):
+            counts["unchanged"] += 1
+        else:
+            place_file(src_file, dest_file, link_mode)
+            counts["copied"] += 1
+            logging.debug(f"Copied file: {src_file} -> {dest_file}")
+        if manifest is not None:
+            manifest.record(dest_file, [src_file], {src_file: signature})
+        if writer is not None:
+            writer.keep(dest_file)
+            writer.compress(dest_file)
+
+    logging.info(f"Synced {src} -> {dst}: {counts['copied']} copied, {counts['unchanged']} unchanged")
+    return counts
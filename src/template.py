@@ -0,0 +1,157 @@
+import os
+import re
+
+# Matches {{ Name }} placeholders
+_SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+# Matches {{> partial.html }} includes, resolved relative to the including file
+_INCLUDE_PATTERN = re.compile(r"\{\{> ([^\s}]+) \}\}")
+# Matches the start of a root-relative href or src attribute
+_ROOT_URL_PATTERN = re.compile(r"(href|src)=\"/")
+# Matches a root-relative href or src attribute up to its query string or fragment
+_ROOT_PATH_PATTERN = re.compile(r"(href|src)=\"(/[^\"?#]*)")
+# Matches a srcset attribute, whose candidates are rewritten one by one
+_SRCSET_PATTERN = re.compile(r"srcset=\"([^\"]*)\"")
+
+
+def _rewrite_url(url: str, basepath, assets) -> str:
+    if assets is not None:
+        url = assets.get(url, url)
+    return basepath + url[1:]
+
+
+def _rewrite_srcset(match, basepath, assets) -> str:
+    candidates = []
+    for candidate in match.group(1).split(", "):
+        if candidate.startswith("/"):
+            url, _, descriptor = candidate.partition(" ")
+            candidate = _rewrite_url(url, basepath, assets) + (" " + descriptor if descriptor else "")
+        candidates.append(candidate)
+    return f"srcset=\"{', '.join(candidates)}\""
+
+
+def rewrite_basepath(html: str, basepath, assets=None) -> str:
+    """
+    Prefixes root-relative href and src attributes with the site's basepath in a single pass.
+    With an asset table (root-relative URL -> fingerprinted URL), the same pass looks up every
+    root-relative path and swaps in the fingerprinted one. Root-relative srcset candidates get
+    a second pass, only in HTML that has a srcset.
+    """
+    if assets:
+        html = _ROOT_PATH_PATTERN.sub(lambda match: f"{match.group(1)}=\"{_rewrite_url(match.group(2), basepath, assets)}", html)
+    elif basepath != "/":
+        html = _ROOT_URL_PATTERN.sub(lambda match: f"{match.group(1)}=\"{basepath}", html)
+    else:
+        return html
+    if "srcset=\"" in html:
+        html = _SRCSET_PATTERN.sub(lambda match: _rewrite_srcset(match, basepath, assets), html)
+    return html
+
+
+def expand_includes(source: str, base_dir: str, dependencies: list, stack=()) -> str:
+    """
+    Inlines {{> path }} partials recursively, appending each included file to dependencies.
+    """
+    def include(match):
+        path = os.path.normpath(os.path.join(base_dir, match.group(1)))
+        if path in stack:
+            raise ValueError(f"Template include cycle: {' -> '.join(stack + (path,))}")
+        if path not in dependencies:
+            dependencies.append(path)
+        with open(path, "r", encoding="utf-8") as partial_file:
+            return expand_includes(partial_file.read(), os.path.dirname(path), dependencies, stack + (path,))
+    return _INCLUDE_PATTERN.sub(include, source)
+
+
+class Template:
+    """
+    A template parsed once into literal chunks and named slots.
+    The basepath rewrite is applied to the literals at compile time, so rendering a page
+    only has to rewrite the slot values and join everything once.
+    Partials are inlined at compile time; `dependencies` lists the template and every
+    file it included, which is what a page built from it depends on. With an asset table,
+    references to static files are rewritten to their fingerprinted URLs along with the basepath.
+    """
+    def __init__(self, source: str, basepath="/", path=None, assets=None):
+        self.basepath = basepath
+        self.assets = assets
+        self.path = path
+        self.dependencies = [path] if path is not None else []
+        base_dir = os.path.dirname(path) if path is not None else ""
+        source = expand_includes(source, base_dir, self.dependencies, (path,) if path is not None else ())
+        # Even indexes are literal text, odd indexes are slot names
+        self.chunks = []
+        position = 0
+        for match in _SLOT_PATTERN.finditer(source):
+            self.chunks.append(rewrite_basepath(source[position:match.start()], basepath, assets))
+            self.chunks.append(match.group(1))
+            position = match.end()
+        self.chunks.append(rewrite_basepath(source[position:], basepath, assets))
+
+    @property
+    def slots(self) -> list:
+        return self.chunks[1::2]
+
+    def _fragments(self, values: dict):
+        """
+        Yields the rendered page piece by piece. A slot value is either a string or an iterable
+        of string fragments (which lets content be streamed); unknown slots are left untouched.
+        """
+        slots = self.slots
+        values = {
+            # A streamed value used by more than one slot has to be materialized first
+            name: list(value) if not isinstance(value, str) and slots.count(name) > 1 else value
+            for name, value in values.items()
+        }
+        for i, chunk in enumerate(self.chunks):
+            if i % 2 == 0:
+                yield chunk
+            elif chunk not in values:
+                yield f"{{{{ {chunk} }}}}"
+            elif isinstance(values[chunk], str):
+                yield rewrite_basepath(values[chunk], self.basepath, self.assets)
+            else:
+                for fragment in values[chunk]:
+                    yield rewrite_basepath(fragment, self.basepath, self.assets)
+
+    def render(self, values: dict) -> str:
+        return "".join(self._fragments(values))
+
+    def stream(self, fp, values: dict):
+        for fragment in self._fragments(values):
+            fp.write(fragment)
+
+
+def file_versions(paths) -> tuple:
+    """
+    Returns the (mtime_ns, size) of each path, a cheap check for whether any of them changed.
+    """
+    versions = []
+    for path in paths:
+        stat = os.stat(path)
+        versions.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(versions)
+
+
+# Compiled templates keyed by (path, basepath, asset table version), invalidated when the
+# file or a partial changes
+_template_cache = {}
+
+def load_template(path: str, basepath="/", assets=None) -> Template:
+    """
+    Reads and compiles a template file, reusing the compiled version while neither the file
+    nor any partial it includes has changed. An asset table is passed on to the template.
+    """
+    key = (path, basepath, assets.version if assets is not None else None)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        try:
+            if cached[0] == file_versions(cached[1].dependencies):
+                return cached[1]
+        except FileNotFoundError:
+            # A partial was removed; recompiling reports it if it is still included
+            pass
+    version = file_versions([path])
+    with open(path, "r", encoding="utf-8") as template_file:
+        template = Template(template_file.read(), basepath, path, assets.urls if assets is not None else None)
+    _template_cache[key] = (version + file_versions(template.dependencies[1:]), template)
+    return template
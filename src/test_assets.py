@@ -0,0 +1,63 @@
+import unittest
+import os
+import json
+import tempfile
+from main import *
+from assets import *
+from template import Template
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body {}")
+        self.write(os.path.join("images", "tom.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative_path, text):
+        with open(os.path.join(self.static, relative_path), "w") as f:
+            f.write(text)
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(os.path.join("css", "site.min.css"), "0123456789abcdef"), os.path.join("css", "site.min.0123456789ab.css"))
+        self.assertEqual(fingerprinted_path("LICENSE", "0123456789abcdef"), "LICENSE.0123456789ab")
+
+    def test_hashes_reused_while_unchanged(self):
+        hashes = HashCache()
+        first = AssetTable.scan(SourceIndex.scan(self.static), hashes)
+        self.assertEqual(hashes.hashed, 2)
+        self.assertEqual(AssetTable.scan(SourceIndex.scan(self.static), hashes).files, first.files)
+        self.assertEqual(hashes.hashed, 2)
+
+        self.write("index.css", "body { margin: 0 }")
+        changed = AssetTable.scan(SourceIndex.scan(self.static), hashes)
+        self.assertEqual(hashes.hashed, 3)
+        self.assertNotEqual(changed.urls["/index.css"], first.urls["/index.css"])
+        self.assertNotEqual(changed.version, first.version)
+
+    def test_place_and_manifest(self):
+        assets = AssetTable.scan(SourceIndex.scan(self.static), HashCache())
+        writer = OutputWriter()
+        self.assertEqual(assets.place(self.static, self.dest, writer=writer), 2)
+        self.assertEqual(assets.place(self.static, self.dest, writer=writer), 0)
+        with open(os.path.join(self.dest, assets.files["index.css"])) as f:
+            self.assertEqual(f.read(), "body {}")
+        with open(assets.save_manifest(self.dest, writer)) as f:
+            self.assertEqual(json.load(f)["images/tom.png"], assets.urls["/images/tom.png"][1:])
+
+    def test_pages_reference_fingerprinted_urls(self):
+        assets = AssetTable.scan(SourceIndex.scan(self.static), HashCache())
+        template = Template('<link href="/index.css"><main>{{ Content }}</main>', "/base/", assets=assets.urls)
+        html = template.render({"Content": '<img src="/images/tom.png?v=1" alt="tom"></img><a href="/blog">blog</a>'})
+        css, png = assets.urls["/index.css"], assets.urls["/images/tom.png"]
+        self.assertEqual(html, f'<link href="/base{css}"><main><img src="/base{png}?v=1" alt="tom"></img><a href="/base/blog">blog</a></main>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import json
+import tempfile
+from blockcache import *
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_render_hits_and_misses(self):
+        cache = BlockCache()
+        block = "This is **bold**"
+        self.assertEqual(cache.render(block), "<p>This is <b>bold</b></p>")
+        self.assertEqual(cache.render(block), "<p>This is <b>bold</b></p>")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        cache = BlockCache(maxsize=2)
+        cache.render("a")
+        cache.render("b")
+        cache.render("a")
+        cache.render("c")
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+    def test_large_blocks_not_cached(self):
+        cache = BlockCache(max_block_size=10)
+        cache.render("x" * 11)
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache.json")
+            cache = BlockCache(path=path)
+            cache.render("- one\n- two")
+            cache.save()
+
+            reloaded = BlockCache(path=path)
+            self.assertEqual(reloaded.get("- one\n- two"), "<ul><li>one</li><li>two</li></ul>")
+
+    def test_other_renderer_version_discarded(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache.json")
+            cache = BlockCache(path=path)
+            cache.render("- one")
+            cache.save()
+            with open(path) as f:
+                data = json.load(f)
+            data["version"] = "older"
+            with open(path, "w") as f:
+                json.dump(data, f)
+
+            self.assertEqual(len(BlockCache(path=path).entries), 0)
+
+    def test_iter_html_blocks_with_cache(self):
+        md = "# Title\n\nsame\n\nsame\n"
+        cache = BlockCache()
+        self.assertEqual(list(iter_html_blocks(md.splitlines(), cache)), list(iter_html_blocks(md.splitlines())))
+        self.assertEqual(cache.hits, 1)
+
+    def test_references_survive_cache_hits(self):
+        md = "[home](/index.html) and ![cat](/cat.png)\n\n[home](/index.html) and ![cat](/cat.png)\n"
+        cache = BlockCache()
+        references = []
+        list(iter_html_blocks(md.splitlines(), cache, references))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(references, [("link", "/index.html"), ("image", "/cat.png")] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import io
 from blocks import *
 
 class TestMarkdowntoBlocks(unittest.TestCase):
@@ -82,6 +83,55 @@ This is the same paragraph on a new line
         block = "> This is not a quote\n- This is not a list"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
     
+class TestStreamingBlocks(unittest.TestCase):
+    def test_iter_blocks_from_file(self):
+        md = "# Title\n\nparagraph\nsame paragraph\n\n```\ncode\n\nmore code\n```\n- a\n- b\n"
+        self.assertEqual(list(iter_blocks(io.StringIO(md))), markdown_to_blocks(md))
+
+    def test_iter_html_blocks(self):
+        md = "# Title\n\n- a\n- b\n"
+        self.assertEqual(
+            "<div>" + "".join(iter_html_blocks(io.StringIO(md))) + "</div>",
+            markdown_to_html_node(md).to_html(),
+        )
+
+    def test_extract_title_from_lines_stops_at_first_h1(self):
+        lines = iter(["intro\n", "# Title\n", "# Second\n"])
+        self.assertEqual(extract_title_from_lines(lines), "Title")
+        self.assertEqual(next(lines), "# Second\n")
+
+class TestTypedBlocks(unittest.TestCase):
+    def test_typed_blocks_offsets(self):
+        md = "# Title\n\n\n- a\n- b\n\n```\ncode\n\nmore\n```\n1. one\n2. two\n\n> quote\n> more"
+        blocks = markdown_to_typed_blocks(md)
+        self.assertEqual([block.text for block in blocks], markdown_to_blocks(md))
+        self.assertEqual([block.start for block in blocks], [0, 3, 6, 11, 14])
+        self.assertEqual(
+            [block.block_type for block in blocks],
+            [BlockType.HEADING, BlockType.UNORDERED_LIST, BlockType.CODE, BlockType.ORDERED_LIST, BlockType.QUOTE],
+        )
+        self.assertEqual(blocks[1].lines, ["- a", "- b"])
+
+    def test_classify_lines_matches_block_to_block_type(self):
+        blocks = [
+            "# Heading", "```\ncode\n```", "> a\n> b", "> a\nb", "- a\n- b", "- a\n-b",
+            "1. a\n2. b", "1. a\n3. b", " 1. a\n2. b ", "1.a", "paragraph\ntext", "> a\n- b",
+        ]
+        for block in blocks:
+            self.assertEqual(classify_lines(block.split("\n")), block_to_block_type(block), block)
+
+    def test_extra_line_breaks_split_like_markdown_to_blocks(self):
+        md = "- a\f- b\n\npara\f\nnext\v\u2028> q"
+        blocks = markdown_to_typed_blocks(md)
+        self.assertEqual([block.text for block in blocks], markdown_to_blocks(md))
+        self.assertEqual([block.block_type for block in blocks], [block_to_block_type(block) for block in markdown_to_blocks(md)])
+        self.assertEqual(blocks[0].lines, ["- a", "- b"])
+
+    def test_block_to_html_node(self):
+        md = "Some **bold**\ntext\n\n- a\n- b\n\n> quote"
+        for block in markdown_to_typed_blocks(md):
+            self.assertEqual(block.to_html_node().to_html(), block_to_html_node(block.text, block_to_block_type(block.text)).to_html())
+
 class TestMarkdowntoHTML(unittest.TestCase):
     def test_paragraphs(self):
         md = """
@@ -239,6 +289,18 @@ More text
 """
         self.assertEqual(extract_title(markdown), "Title")
 
+    def test_split_title_replays_lines(self):
+        read = []
+        def source():
+            for line in ["Some text", "# Title", "", "More text", "# Other"]:
+                read.append(line)
+                yield line
+        title, lines = split_title(source())
+        self.assertEqual(title, "Title")
+        # Nothing past the first H1 is read until the blocks are
+        self.assertEqual(read, ["Some text", "# Title"])
+        self.assertEqual(list(iter_blocks(lines)), ["Some text\n# Title", "More text\n# Other"])
+
 
 
 
@@ -0,0 +1,35 @@
+import unittest
+import io
+import logging
+from buildlog import *
+
+
+class TestBuildLog(unittest.TestCase):
+    def tearDown(self):
+        stop_logging()
+        logging.getLogger().handlers = []
+
+    def test_queue_logging_flushes_on_stop(self):
+        stream = io.StringIO()
+        setup_logging(logging.INFO, stream)
+        logging.debug("hidden")
+        logging.info("shown")
+        stop_logging()
+        self.assertEqual(stream.getvalue(), "shown\n")
+
+    def test_progress_every(self):
+        stream = io.StringIO()
+        setup_logging(logging.INFO, stream)
+        progress = Progress("Pages", 5, every=2)
+        for _ in range(5):
+            progress.advance()
+        progress.finish("0 failed")
+        stop_logging()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[:2], ["Pages: 2/5", "Pages: 4/5"])
+        self.assertTrue(lines[2].startswith("Pages: 5 done in"))
+        self.assertTrue(lines[2].endswith("(0 failed)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import gzip
+import tempfile
+from compress import *
+from output import OutputWriter
+
+
+class TestCompressor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.cache = os.path.join(self.root, "compress.json")
+        self.page = os.path.join(self.root, "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, html, formats=("gzip",)):
+        compressor = Compressor(formats, self.cache)
+        writer = OutputWriter(compressor)
+        writer.write(self.page, html)
+        compressor.close()
+        return compressor, writer
+
+    def test_sibling_matches_output(self):
+        compressor, writer = self.build("<p>hello</p>" * 100)
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertIn(os.path.normpath(self.page + ".gz"), writer.seen)
+        self.assertLess(compressor.sizes["gzip"], compressor.sizes["input"])
+
+    def test_unchanged_output_skipped(self):
+        self.assertEqual(self.build("<p>a</p>")[0].counts, {"compressed": 1, "unchanged": 0})
+        self.assertEqual(self.build("<p>a</p>")[0].counts, {"compressed": 0, "unchanged": 1})
+        self.assertEqual(self.build("<p>b</p>")[0].counts, {"compressed": 1, "unchanged": 0})
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>b</p>")
+
+    def test_missing_sibling_recreated(self):
+        self.build("<p>a</p>")
+        os.remove(self.page + ".gz")
+        self.assertEqual(self.build("<p>a</p>")[0].counts["compressed"], 1)
+
+    def test_copied_file_hashed_once(self):
+        style = os.path.join(self.root, "index.css")
+        with open(style, "w") as f:
+            f.write("body {}")
+        for hashed in (1, 0):
+            compressor = Compressor(cache_path=self.cache)
+            OutputWriter(compressor).compress(style)
+            compressor.close()
+            self.assertEqual(compressor.hashes.hashed, hashed)
+        self.assertTrue(os.path.exists(style + ".gz"))
+
+    def test_other_files_not_compressed(self):
+        image = os.path.join(self.root, "tom.png")
+        with open(image, "wb") as f:
+            f.write(b"png")
+        compressor = Compressor()
+        self.assertEqual(compressor.submit(image), [])
+        compressor.close()
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+    def test_removed_output_siblings_deleted(self):
+        self.build("<p>a</p>")
+        os.remove(self.page)
+        compressor = Compressor(cache_path=self.cache)
+        compressor.close([self.page])
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertEqual(compressor.compressed, {})
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_sibling(self):
+        self.build("<p>hello</p>", ("gzip", "br"))
+        with open(self.page + ".br", "rb") as f:
+            self.assertEqual(brotli.decompress(f.read()), b"<p>hello</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import os
+import random
+import tempfile
+from corpus import *
+from blocks import markdown_to_html_node, extract_title
+
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(generate_markdown(random.Random(7), 20), generate_markdown(random.Random(7), 20))
+
+    def test_pages_render(self):
+        markdown = generate_markdown(random.Random(1), 200, inline=0.5)
+        self.assertTrue(extract_title(markdown))
+        markdown_to_html_node(markdown).to_html()
+
+    def test_generate_corpus_layout(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = generate_corpus(root, 12, blocks=3, depth=2, fanout=3)
+            pages = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(paths["content"]) for name in names]
+            self.assertEqual(len(pages), 12)
+            self.assertTrue(os.path.exists(os.path.join(paths["content"], "d2", "d0", "page2", "index.md")))
+            self.assertTrue(os.path.exists(paths["template"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from depgraph import *
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.set_inputs("docs/index.html", ["content/index.md", "template.html", "partials/nav.html"])
+        self.graph.set_inputs("docs/blog/index.html", ["content/blog/index.md", "template.html"])
+
+    def test_dirty(self):
+        self.assertEqual(self.graph.dirty(["content/index.md"]), {"docs/index.html"})
+        self.assertEqual(self.graph.dirty(["partials/nav.html"]), {"docs/index.html"})
+        self.assertEqual(self.graph.dirty(["template.html"]), {"docs/index.html", "docs/blog/index.html"})
+        self.assertEqual(self.graph.dirty(["unrelated.md"]), set())
+
+    def test_set_inputs_replaces_edges(self):
+        self.graph.set_inputs("docs/index.html", ["content/index.md", "template.html"])
+        self.assertEqual(self.graph.dirty(["partials/nav.html"]), set())
+        self.assertNotIn("partials/nav.html", self.graph.dependents)
+
+    def test_remove_output(self):
+        self.graph.remove_output("docs/blog/index.html")
+        self.assertNotIn("docs/blog/index.html", self.graph)
+        self.assertNotIn("content/blog/index.md", self.graph.dependents)
+        self.assertEqual(self.graph.dependents_of("template.html"), {"docs/index.html"})
+
+    def test_round_trip(self):
+        graph = DependencyGraph.from_dict(self.graph.to_dict())
+        self.assertEqual(graph.inputs, self.graph.inputs)
+        self.assertEqual(graph.dependents, self.graph.dependents)
+
+
+if __name__ == "__main__":
+    unittest.main()
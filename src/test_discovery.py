@@ -0,0 +1,54 @@
+import unittest
+import os
+import json
+import tempfile
+from discovery import *
+
+
+class TestSourceIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for relative_path in ("index.md", "blog.md", "blog/b.md", "blog/a/index.md", "images/tom.png"):
+            self.write(relative_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative_path, text="x"):
+        path = os.path.join(self.root, *relative_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_scan_is_sorted_depth_first(self):
+        index = SourceIndex.scan(self.root)
+        expected = ["blog/a/index.md", "blog/b.md", "blog.md", "index.md"]
+        self.assertEqual(index.pages(), [os.path.join(*path.split("/")) for path in expected])
+        self.assertEqual(len(index.files), 5)
+        self.assertEqual(index.files[-1][1], 1)
+        self.assertIn(os.path.join("blog", "a"), index.directories)
+
+    def test_discover_reuses_unchanged_index(self):
+        cache = {}
+        self.assertTrue(discover(self.root, cache).fresh)
+        cache = json.loads(json.dumps(cache))
+        reused = discover(self.root, cache)
+        self.assertFalse(reused.fresh)
+        self.assertEqual(reused.files, SourceIndex.scan(self.root).files)
+
+        self.write("blog/a/new.md")
+        rescanned = discover(self.root, cache)
+        self.assertTrue(rescanned.fresh)
+        self.assertIn(os.path.join("blog", "a", "new.md"), rescanned.pages())
+
+    def test_save_and_load_cache(self):
+        path = os.path.join(self.root, "index.json")
+        cache = load_index_cache(path)
+        discover(self.root, cache)
+        save_index_cache(path, cache)
+        self.assertEqual(load_index_cache(path).keys(), {self.root})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import io
 
 from htmlnode import *
 
@@ -64,6 +65,19 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_matches_to_html(self):
+        children = [ParentNode("li", [LeafNode(None, f"item {i}")]) for i in range(3)]
+        parent_node = ParentNode("ul", children, {"class": "list"})
+        fragments = list(parent_node.iter_html())
+        self.assertEqual(fragments[0], "<ul class=\"list\">")
+        self.assertEqual("".join(fragments), parent_node.to_html())
+
+    def test_write_html(self):
+        parent_node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        fp = io.StringIO()
+        parent_node.write_html(fp)
+        self.assertEqual(fp.getvalue(), "<p><b>bold</b> text</p>")
+
     
 
 
@@ -0,0 +1,126 @@
+import unittest
+import os
+import struct
+import tempfile
+from main import *
+from images import *
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 8
+
+
+def jpeg(width, height):
+    # SOI, an APP0 segment to skip over, then the start-of-frame with the dimensions
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+class TestImageSize(unittest.TestCase):
+    def test_headers(self):
+        with tempfile.TemporaryDirectory() as root:
+            for name, data in (("a.png", png(640, 480)), ("a.gif", gif(32, 16)), ("a.jpg", jpeg(1024, 768)), ("a.txt", b"text")):
+                with open(os.path.join(root, name), "wb") as f:
+                    f.write(data)
+            self.assertEqual(image_size(os.path.join(root, "a.png")), (640, 480))
+            self.assertEqual(image_size(os.path.join(root, "a.gif")), (32, 16))
+            self.assertEqual(image_size(os.path.join(root, "a.jpg")), (1024, 768))
+            self.assertIsNone(image_size(os.path.join(root, "a.txt")))
+
+    def test_variant_path(self):
+        self.assertEqual(variant_path(os.path.join("images", "tom.png"), 480), os.path.join("images", "tom-480w.png"))
+
+
+class TestImageCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.static = os.path.join(self.root, "static")
+        self.cache_dir = os.path.join(self.root, "cache")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("tom.png", png(928, 468))
+        self.write("logo.gif", gif(32, 16))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        with open(os.path.join(self.static, "images", name), "wb") as f:
+            f.write(data)
+
+    def scan(self):
+        cache = ImageCache(self.cache_dir)
+        catalog = ImageCatalog.scan(SourceIndex.scan(self.static), cache)
+        cache.save()
+        return catalog, cache
+
+    def test_img_tags_get_dimensions(self):
+        catalog, _ = self.scan()
+        md = "# Tom\n\n![Tom](/images/tom.png) and ![missing](/images/none.png)\n"
+        html = "".join(iter_html_blocks(md.splitlines(), images=catalog))
+        self.assertIn('<img src="/images/tom.png" alt="Tom" width="928" height="468"></img>', html)
+        self.assertIn('<img src="/images/none.png" alt="missing"></img>', html)
+        # Cached blocks are namespaced by the catalog, so they never mix with plain renders
+        cache = BlockCache(namespace=catalog.namespace)
+        self.assertEqual("".join(iter_html_blocks(md.splitlines(), cache, images=catalog)), html)
+        self.assertNotEqual(cache.key(md), BlockCache().key(md))
+
+    def test_cache_is_content_addressed(self):
+        _, cache = self.scan()
+        self.assertEqual(cache.processed, 2)
+        _, cache = self.scan()
+        self.assertEqual(cache.processed, 0)
+
+        # A copy of an image is matched by its content, a changed image is read again
+        self.write("copy.png", png(928, 468))
+        self.write("logo.gif", gif(64, 32))
+        catalog, cache = self.scan()
+        self.assertEqual(cache.processed, 1)
+        self.assertEqual(catalog.props["/images/copy.png"], {"width": "928", "height": "468"})
+        self.assertEqual(catalog.props["/images/logo.gif"], {"width": "64", "height": "32"})
+
+    def test_pages_depend_on_their_images(self):
+        content = os.path.join(self.root, "content")
+        dest = os.path.join(self.root, "docs")
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("{{ Title }}{{ Content }}")
+        os.makedirs(content)
+        for name, image in (("tom.md", "tom.png"), ("logo.md", "logo.gif")):
+            with open(os.path.join(content, name), "w") as f:
+                f.write(f"# {name}\n\n![{name}](/images/{image})")
+
+        manifest_path = os.path.join(self.root, "manifest.json")
+        for expected in (2, 0, 1):
+            if expected == 1:
+                self.write("logo.gif", gif(64, 32))
+            catalog, _ = self.scan()
+            manifest = BuildManifest(manifest_path)
+            sync_directory(self.static, dest, manifest)
+            writer = OutputWriter()
+            generate_pages_recursive(content, template, dest, "/", manifest, writer=writer, images=catalog)
+            manifest.save()
+            self.assertEqual(writer.written, expected)
+        with open(os.path.join(dest, "logo.html")) as f:
+            self.assertIn('width="64" height="32"', f.read())
+
+    @unittest.skipUnless(RESIZE_SUPPORTED, "variants need Pillow")
+    def test_variants_and_srcset(self):
+        from PIL import Image
+        Image.new("RGB", (800, 400)).save(os.path.join(self.static, "images", "tom.png"))
+        cache = ImageCache(self.cache_dir)
+        catalog = ImageCatalog.scan(SourceIndex.scan(self.static), cache, (200, 1600))
+        self.assertEqual(catalog.props["/images/tom.png"]["srcset"], "/images/tom-200w.png 200w, /images/tom.png 800w")
+        dest = os.path.join(self.root, "docs")
+        self.assertEqual(catalog.place_variants(dest), 1)
+        self.assertEqual(image_size(os.path.join(dest, "images", "tom-200w.png")), (200, 100))
+        self.assertEqual(catalog.place_variants(dest), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import random
 from inline import *
 
 class TestInline(unittest.TestCase):
@@ -43,6 +44,10 @@ class TestInline(unittest.TestCase):
             node = TextNode("This is text with a **bold word", TextType.TEXT)
             new_nodes = split_nodes_delimiter([node], "**", TextType.BOLD)
 
+    def test_node_without_delimiter_passed_through(self):
+        node = TextNode("plain text", TextType.TEXT)
+        self.assertIs(split_nodes_delimiter([node], "**", TextType.BOLD)[0], node)
+
     def test_bold_italic(self):
         node = TextNode("This is text with a **bold** and an _italics_ word", TextType.TEXT)
         new_nodes = split_nodes_delimiter([node], "**", TextType.BOLD)
@@ -125,7 +130,59 @@ class TestInline(unittest.TestCase):
             TextNode("link", TextType.LINK, "https://boot.dev"),
         ], new_nodes)
 
-        
+
+def chained_text_to_textnodes(text):
+    # The original five-pass pipeline that scan_inline must reproduce
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_image(nodes)
+    return split_nodes_link(nodes)
+
+class TestScanInline(unittest.TestCase):
+    def assertSameAsChain(self, text):
+        try:
+            expected = chained_text_to_textnodes(text)
+        except ValueError as e:
+            with self.assertRaises(ValueError) as context:
+                scan_inline(text)
+            self.assertEqual(str(context.exception), str(e))
+            return
+        self.assertListEqual(scan_inline(text), expected)
+
+    def test_precedence_quirks(self):
+        self.assertSameAsChain("[link](https://example.com/a_b_c)")
+        self.assertSameAsChain("**bold with `tick** and `code`")
+        self.assertSameAsChain("`code **with** stars`")
+        self.assertSameAsChain("![img](/a.png)[link](/b)")
+        self.assertSameAsChain("](*(([]([![)(]())")
+        self.assertSameAsChain("")
+
+    def test_unmatched_priority(self):
+        with self.assertRaisesRegex(ValueError, r"'\*\*'"):
+            scan_inline("**bold and `code and _italic")
+        with self.assertRaisesRegex(ValueError, "'`'"):
+            scan_inline("_italic `code_")
+
+    def test_plain_prose_fast_path(self):
+        self.assertListEqual(scan_inline("Just words! Nothing else."), [TextNode("Just words! Nothing else.", TextType.TEXT)])
+        self.assertListEqual(scan_inline(""), [])
+
+    def test_delimiter_not_present(self):
+        nodes = [TextNode("plain", TextType.TEXT), TextNode("", TextType.TEXT), TextNode("b", TextType.BOLD)]
+        self.assertListEqual(
+            split_nodes_delimiter(nodes, "`", TextType.CODE),
+            [TextNode("plain", TextType.TEXT), TextNode("b", TextType.BOLD)],
+        )
+
+    def test_random_inputs(self):
+        tokens = ["a", " ", "**", "*", "`", "_", "!", "[", "]", "(", ")", "[x](u)", "![y](v)", "b_c"]
+        rng = random.Random(1234)
+        for _ in range(2000):
+            text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 16)))
+            self.assertSameAsChain(text)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import unittest
+import os
+import json
+import tempfile
+from main import *
+from linkcheck import *
+
+
+class TestResolve(unittest.TestCase):
+    def test_resolve(self):
+        self.assertIsNone(resolve("https://example.com/x", "index.html"))
+        self.assertIsNone(resolve("mailto:me@example.com", "index.html"))
+        self.assertIsNone(resolve("//cdn.example.com/x.js", "index.html"))
+        self.assertEqual(resolve("#top", "blog/tom/index.html"), "")
+        self.assertEqual(resolve("/blog/tom#intro", "index.html"), "blog/tom")
+        self.assertEqual(resolve("../majesty?x=1", "blog/tom/index.html"), "blog/majesty")
+        self.assertEqual(resolve("cat%20photo.png", "blog/index.html"), "blog/cat photo.png")
+
+    def test_candidates(self):
+        self.assertEqual(candidates(""), ("index.html",))
+        self.assertIn("blog/tom/index.html", candidates("blog/tom"))
+
+
+class TestLinkCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        pages = {
+            "index.md": "# Home\n\n[Tom](/blog/tom) and [contact](contact.html)\n\n![logo](/images/logo.png)",
+            "contact.md": "# Contact\n\n[home](/) and [gone](/blog/gone) and [site](https://example.com)",
+            os.path.join("blog", "tom", "index.md"): "# Tom\n\n[up](../../index.html) ![missing](missing.png)",
+        }
+        for path, text in pages.items():
+            path = os.path.join(self.content, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check(self, links):
+        pages = [dest for _, dest in collect_pages(self.content, self.dest)]
+        return links.check(self.dest, pages, [os.path.join("images", "logo.png")])
+
+    def test_broken_references_found_in_one_pass(self):
+        expected = [
+            (os.path.join(self.dest, "blog", "tom", "index.html"), "image", "missing.png"),
+            (os.path.join(self.dest, "contact.html"), "link", "/blog/gone"),
+        ]
+        for options in ({}, {"jobs": 2}, {"pipeline": True}):
+            links = LinkIndex()
+            generate_pages_recursive(self.content, self.template, self.dest, "/", links=links, **options)
+            self.assertEqual(len(links.references), 3)
+            self.assertEqual(self.check(links), expected)
+
+    def test_incremental_build_keeps_references(self):
+        manifest_path = os.path.join(self.root, "manifest.json")
+        manifest = BuildManifest(manifest_path)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest, links=LinkIndex(manifest.references))
+        manifest.save()
+
+        # Nothing is regenerated, but every page's references come back from the manifest
+        manifest = BuildManifest(manifest_path)
+        links = LinkIndex(manifest.references)
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest, links=links)
+        self.assertEqual(len(self.check(links)), 2)
+
+    def test_report(self):
+        links = LinkIndex()
+        links.set("docs/index.html", [("link", "/gone")])
+        path = os.path.join(self.root, "report.json")
+        with self.assertLogs(level="ERROR"):
+            links.report([("docs/index.html", "link", "/gone")], path)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(report["references"], 1)
+        self.assertEqual(report["broken"], [{"page": "docs/index.html", "type": "link", "url": "/gone"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import os
+import tempfile
+from main import *
+
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+        for i in range(5):
+            self.write_page(os.path.join("section", f"page{i}", "index.md"), f"# Page {i}\n\nSee [home](/).")
+        self.write_page("index.md", "# Home\n\n- one\n- two")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, relative_path, markdown):
+        path = os.path.join(self.content, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+
+    def read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_collect_pages(self):
+        dest = os.path.join(self.root, "out")
+        pages = collect_pages(self.content, dest)
+        self.assertEqual(len(pages), 6)
+        self.assertIn((os.path.join(self.content, "index.md"), os.path.join(dest, "index.html")), pages)
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/base/")
+        generate_pages_recursive(self.content, self.template, parallel, "/base/", jobs=2)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_parallel_reports_failures(self):
+        self.write_page("broken.md", "no title here")
+        pages = collect_pages(self.content, os.path.join(self.root, "out"))
+        failures = generate_pages_parallel(pages, self.template, "/", 2, batch_size=2)
+        self.assertEqual([path for path, _ in failures], [os.path.join(self.content, "broken.md")])
+        self.assertIn("No H1 header", failures[0][1])
+
+    def test_line_boundaries_match_markdown_to_html_node(self):
+        markdown = "# Title\n\npara\f\nnext\n\nline one\fline two\vline three\n\n- a\u2028- b\n"
+        self.write_page("breaks.md", markdown)
+        dest = os.path.join(self.root, "breaks.html")
+        expected = markdown_to_html_node(markdown).to_html()
+        generate_page(os.path.join(self.content, "breaks.md"), self.template, dest, "/")
+        with open(dest) as f:
+            self.assertIn(expected, f.read())
+        pipelined = os.path.join(self.root, "pipelined.html")
+        generate_pages_pipelined([(os.path.join(self.content, "breaks.md"), pipelined)], load_template(self.template))
+        with open(pipelined) as f:
+            self.assertIn(expected, f.read())
+
+    def test_pipeline_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        generate_pages_recursive(self.content, self.template, serial, "/base/")
+        generate_pages_recursive(self.content, self.template, pipelined, "/base/", pipeline=True)
+        self.assertEqual(self.read_tree(serial), self.read_tree(pipelined))
+
+    def test_pipeline_keeps_page_order_and_reports_failures(self):
+        self.write_page("broken.md", "no title here")
+        pages = collect_pages(self.content, os.path.join(self.root, "out"))
+        done = []
+        failures = generate_pages_pipelined(pages, load_template(self.template), depth=2, on_success=lambda src, dest: done.append(src))
+        self.assertEqual([path for path, _ in failures], [os.path.join(self.content, "broken.md")])
+        self.assertEqual(done, [src for src, _ in pages if not src.endswith("broken.md")])
+
+    def test_pipeline_records_successful_pages_in_manifest(self):
+        self.write_page("broken.md", "no title here")
+        dest = os.path.join(self.root, "out")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        with self.assertRaises(RuntimeError):
+            generate_pages_recursive(self.content, self.template, dest, "/", manifest=manifest, pipeline=True)
+        manifest.save()
+        pages = dict(collect_pages(self.content, dest))
+        broken = pages[os.path.join(self.content, "broken.md")]
+        self.assertEqual(set(BuildManifest(manifest.path).graph.outputs()), set(pages.values()) - {broken})
+
+    def test_pipeline_streams_large_sources_in_order(self):
+        self.write_page("broken.md", "no title here")
+        dest = os.path.join(self.root, "out")
+        pages = collect_pages(self.content, dest)
+        sizes = sorted(os.path.getsize(src) for src, _ in pages)
+        done = []
+        links = LinkIndex()
+        # The larger half of the pages is streamed instead of read ahead
+        failures = generate_pages_pipelined(pages, load_template(self.template), depth=2, on_success=lambda src, dest: done.append(src), links=links, stream_size=sizes[len(sizes) // 2])
+        self.assertEqual([path for path, _ in failures], [os.path.join(self.content, "broken.md")])
+        self.assertEqual(done, [src for src, _ in pages if not src.endswith("broken.md")])
+        self.assertEqual(links.references[os.path.join(dest, "section", "page0", "index.html")], [("link", "/")])
+
+        os.remove(os.path.join(self.content, "broken.md"))
+        serial = os.path.join(self.root, "serial")
+        generate_pages_recursive(self.content, self.template, serial, "/")
+        self.assertEqual(self.read_tree(serial), self.read_tree(dest))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import os
+import tempfile
+from manifest import *
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.src = os.path.join(self.root, "page.md")
+        self.out = os.path.join(self.root, "page.html")
+        self.path = os.path.join(self.root, "manifest.json")
+        with open(self.src, "w") as f:
+            f.write("# Title")
+        with open(self.out, "w") as f:
+            f.write("<h1>Title</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_not_outdated(self):
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated({self.out: [self.src]}), {self.out})
+        manifest.record(self.out, [self.src])
+        manifest.save()
+
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated({self.out: [self.src]}), set())
+        self.assertIn(self.out, manifest.seen)
+
+    def test_changed_input(self):
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.save()
+        with open(self.src, "w") as f:
+            f.write("# Other")
+
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated({self.out: [self.src]}), {self.out})
+
+    def test_missing_output(self):
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.save()
+        os.remove(self.out)
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated({self.out: [self.src]}), {self.out})
+
+    def test_changed_inputs_list(self):
+        partial = os.path.join(self.root, "nav.html")
+        with open(partial, "w") as f:
+            f.write("x")
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.save()
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated({self.out: [self.src, partial]}), {self.out})
+
+    def test_prune_removes_unseen_outputs(self):
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.save()
+
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.prune(), [self.out])
+        self.assertFalse(os.path.exists(self.out))
+        self.assertEqual(len(manifest.graph), 0)
+        self.assertEqual(manifest.inputs, {})
+
+    def test_outdated_follows_changed_partial(self):
+        partial = os.path.join(self.root, "nav.html")
+        other_src = os.path.join(self.root, "other.md")
+        other_out = os.path.join(self.root, "other.html")
+        for path in (partial, other_src, other_out):
+            with open(path, "w") as f:
+                f.write("x")
+        targets = {self.out: [self.src, partial], other_out: [other_src]}
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated(targets), {self.out, other_out})
+        for output, inputs in targets.items():
+            manifest.record(output, inputs)
+        manifest.save()
+
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated(targets), set())
+        with open(partial, "w") as f:
+            f.write("edited")
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated(targets), {self.out})
+        self.assertEqual(manifest.dirty([partial]), {self.out})
+
+    def test_shared_input_recorded_before_check(self):
+        # A static file synced before the pages that use it are checked still dirties them
+        targets = {self.out: [self.src]}
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.save()
+        with open(self.src, "w") as f:
+            f.write("# edited")
+        manifest = BuildManifest(self.path)
+        manifest.record(os.path.join(self.root, "copy.md"), [self.src])
+        self.assertEqual(manifest.outdated(targets), {self.out})
+
+
+    def test_unchanged_inputs_not_hashed(self):
+        other = os.path.join(self.root, "other.md")
+        with open(other, "w") as f:
+            f.write("# Other")
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.record(other + ".html", [other])
+        manifest.save()
+        with open(other, "w") as f:
+            f.write("# Edited")
+
+        manifest = BuildManifest(self.path)
+        self.assertEqual(manifest.outdated({self.out: [self.src], other + ".html": [other]}), {other + ".html"})
+        # Only the edited input was read
+        self.assertEqual(manifest.hashed, 1)
+
+    def test_touched_input_rehashed(self):
+        manifest = BuildManifest(self.path)
+        manifest.record(self.out, [self.src])
+        manifest.save()
+        os.utime(self.src, ns=(1, 1))
+
+        manifest = BuildManifest(self.path)
+        # Same content under a new mtime is read again but is not a change
+        self.assertEqual(manifest.outdated({self.out: [self.src]}), set())
+        self.assertEqual(manifest.hashed, 1)
+
+    def test_hash_cache_saves_only_seen_files(self):
+        stat = os.stat(self.src)
+        hashes = HashCache({os.path.join(self.root, "gone.md"): [1, 1, "x"]})
+        digest = hashes.digest(self.src, stat.st_size, stat.st_mtime_ns)
+        self.assertEqual(digest, file_hash(self.src))
+        hashes.save(self.path)
+
+        hashes = HashCache.load(self.path)
+        self.assertEqual(list(hashes.files), [self.src])
+        self.assertEqual(hashes.digest(self.src, stat.st_size, stat.st_mtime_ns), digest)
+        self.assertEqual(hashes.hashed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
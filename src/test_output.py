@@ -0,0 +1,82 @@
+import unittest
+import os
+import tempfile
+from output import *
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.path = os.path.join(self.root, "page.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_skips_identical_content(self):
+        writer = OutputWriter()
+        self.assertTrue(writer.write(self.path, "<p>hi</p>"))
+        os.utime(self.path, ns=(0, 0))
+
+        self.assertFalse(writer.write(self.path, "<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertTrue(writer.write(self.path, "<p>bye</p>"))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>bye</p>")
+        self.assertEqual(writer.counts(), {"written": 2, "unchanged": 1, "deleted": 0})
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_error_leaves_destination_untouched(self):
+        writer = OutputWriter()
+        writer.write(self.path, "old")
+        with self.assertRaises(RuntimeError):
+            with writer.open(self.path) as output:
+                output.write("partial")
+                raise RuntimeError("render failed")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_prune_removes_unproduced_files(self):
+        OutputWriter().claim(self.root)
+        os.makedirs(os.path.join(self.root, "old"))
+        stale = os.path.join(self.root, "old", "page.html")
+        with open(stale, "w") as f:
+            f.write("stale")
+        writer = OutputWriter()
+        self.assertTrue(writer.claim(self.root))
+        writer.write(self.path, "new")
+        self.assertEqual(writer.prune(self.root), [stale])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "old")))
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(writer.deleted, 1)
+
+    def test_unrelated_directory_not_pruned(self):
+        with open(self.path, "w") as f:
+            f.write("not ours")
+        writer = OutputWriter()
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(writer.claim(self.root))
+        self.assertEqual(writer.prune(self.root), [])
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_remove_empty_parents(self):
+        for name in ("a/b/c", "a/d"):
+            os.makedirs(os.path.join(self.root, name))
+        with open(os.path.join(self.root, "a", "d", "keep.html"), "w") as f:
+            f.write("kept")
+        removed = remove_empty_parents([os.path.join(self.root, "a", "b", "c", "gone.html")], self.root)
+        self.assertEqual(removed, [os.path.join(self.root, "a", "b", "c"), os.path.join(self.root, "a", "b")])
+        self.assertEqual(os.listdir(os.path.join(self.root, "a")), ["d"])
+        self.assertEqual(remove_empty_parents([os.path.join(self.root, "page.html")], self.root), [])
+        self.assertTrue(os.path.isdir(self.root))
+
+    def test_unclaimed_directory_not_pruned(self):
+        with open(self.path, "w") as f:
+            f.write("stale")
+        self.assertEqual(OutputWriter().prune(self.root), [])
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import io
+import tempfile
+from profiling import *
+from blockcache import BlockCache
+from template import Template
+from main import generate_page
+
+
+class TestProfiling(unittest.TestCase):
+    def test_profiled_blocks_match(self):
+        md = "# Title\n\nSome **bold** text\n\n- a\n- b\n"
+        profile = PageProfile("page.md")
+        self.assertEqual(
+            list(profiled_html_blocks(io.StringIO(md), profile)),
+            list(iter_html_blocks(io.StringIO(md))),
+        )
+        self.assertEqual(profile.blocks, 3)
+        # h1 + text, p + three text nodes, ul + two li + two text nodes
+        self.assertEqual(profile.nodes, 2 + 4 + 5)
+
+    def test_report(self):
+        with tempfile.TemporaryDirectory() as root:
+            profiler = BuildProfiler()
+            for name, seconds in (("fast.md", 0.1), ("slow.md", 0.5)):
+                path = os.path.join(root, name)
+                with open(path, "w") as f:
+                    f.write("# Title")
+                profile = profiler.page(path)
+                profile.stages["inline"] = seconds / 2
+                profile.total = seconds
+                profiler.add(profile)
+
+            report = profiler.report(slowest=1)
+            self.assertEqual(report["pages"], 2)
+            self.assertEqual(report["bytes_in"], 14)
+            self.assertEqual(report["slowest"][0]["path"], os.path.join(root, "slow.md"))
+            # Time outside the measured stages is not charged to any of them
+            self.assertAlmostEqual(report["stages"]["other"], 0.3)
+            self.assertEqual(report["stages"]["template"], 0.0)
+            self.assertIn("slow.md", profiler.summary_table())
+
+    def test_cached_blocks_report_nodes(self):
+        md = "# Title\n\nSome **bold** text\n"
+        cache = BlockCache(16)
+        first, second = PageProfile("a.md"), PageProfile("b.md")
+        list(profiled_html_blocks(io.StringIO(md), first, cache))
+        list(profiled_html_blocks(io.StringIO(md), second, cache))
+        self.assertEqual(second.cache_hits, 2)
+        self.assertEqual(second.nodes, first.nodes)
+
+    def test_node_counts_kept_in_cache_entries(self):
+        md = "# Title\n\nSome **bold** text\n"
+        cache = BlockCache(16)
+        # Rendered without the profiler first, so the entries have no count yet
+        list(iter_html_blocks(md.splitlines(), cache))
+        profile = PageProfile("a.md")
+        list(profiled_html_blocks(md.splitlines(), profile, cache))
+        self.assertEqual(profile.nodes, 2 + 4)
+        self.assertEqual([entry[2] for entry in cache.entries.values()], [2, 4])
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache.json")
+            cache.save(path)
+            self.assertEqual([entry[2] for entry in BlockCache(path=path).entries.values()], [2, 4])
+
+    def test_no_block_state_left_after_page(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            with open(source, "w") as f:
+                f.write("# Title\n\n" + "\n\n".join(f"Block {i} with **bold** text" for i in range(100)))
+            profiler = BuildProfiler()
+            generate_page(source, None, os.path.join(root, "page.html"), "/", Template("{{ Content }}"), profiler=profiler)
+        self.assertEqual(profiler.pages[0]["nodes"], 2 + 100 * 4)
+        # Nothing per block survives the page in module state
+        import profiling
+        self.assertEqual([name for name, value in vars(profiling).items() if isinstance(value, (dict, list, set)) and value and not name.startswith("__")], [])
+
+    def test_stages_timed_separately(self):
+        md = "# Title\n\n" + "\n\n".join("Some **bold** and _italic_ text with a [link](/x)" for _ in range(200))
+        profile = PageProfile("page.md")
+        out = io.StringIO()
+        content = profiled_html_blocks(io.StringIO(md), profile)
+        profiled_stream(Template("<title>{{ Title }}</title>{{ Content }}"), TimedWriter(out, profile), {"Title": "Tïtle", "Content": content}, profile)
+        for stage in ("read", "split", "classify", "inline", "tree", "to_html", "template", "write"):
+            self.assertGreater(profile.stages[stage], 0.0, stage)
+        self.assertEqual(profile.bytes_out, len(out.getvalue().encode("utf-8")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import tempfile
+from reader import *
+
+
+class TestMappedSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def lines(self, data: bytes, chunk_size: int = CHUNK_SIZE):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        with MappedSource(self.path, chunk_size) as source:
+            mapped = list(source)
+        # The same lines as splitting the whole file
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(mapped, f.read().splitlines())
+        return mapped
+
+    def test_lines(self):
+        self.assertEqual(self.lines(b"# Title\n\nText\n"), ["# Title", "", "Text"])
+        self.assertEqual(self.lines(b"# Title\n\nText"), ["# Title", "", "Text"])
+        self.assertEqual(self.lines(b""), [])
+        self.assertEqual(self.lines(b"\n\n"), ["", ""])
+
+    def test_universal_newlines(self):
+        self.assertEqual(self.lines(b"a\r\nb\rc\n\r\n"), ["a", "b", "c", ""])
+
+    def test_other_line_boundaries(self):
+        self.assertEqual(self.lines("a\fb\f\nc\vd\u2028e\x85".encode("utf-8")), ["a", "b", "", "c", "d", "e"])
+
+    def test_chunk_boundaries(self):
+        text = "".join(f"line {i} é—\U0001f600\n" for i in range(200)) + "x" * 100 + "\n"
+        self.assertEqual(len(self.lines(text.encode("utf-8"), chunk_size=16)), 201)
+
+    def test_open_source(self):
+        with open(self.path, "w") as f:
+            f.write("# Title\n")
+        with open_source(self.path) as source:
+            self.assertNotIsInstance(source, MappedSource)
+            self.assertEqual(list(source), ["# Title"])
+        with open_source(self.path, mmap_threshold=0) as source:
+            self.assertIsInstance(source, MappedSource)
+            self.assertEqual(list(source), ["# Title"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import shutil
+import tempfile
+from server import *
+
+
+class TestSiteCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\n- post")
+        self.site = SiteCache(self.content, self.template)
+        self.site.refresh()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_lookup(self):
+        self.assertEqual(self.site.lookup("/"), b"<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>")
+        self.assertEqual(self.site.lookup("/blog"), self.site.lookup("/blog/index.html"))
+        self.assertIsNone(self.site.lookup("/missing"))
+
+    def test_refresh_only_changed_page(self):
+        self.assertEqual(self.site.refresh(), [])
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited", 1)
+        self.assertEqual(self.site.refresh(), ["/index.html"])
+        self.assertIn(b"Edited", self.site.lookup("/"))
+
+    def test_template_change_reuses_trees(self):
+        trees = dict(self.site.trees)
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", 1)
+        self.assertEqual(self.site.refresh(), ["/blog/index.html", "/index.html"])
+        self.assertEqual(self.site.lookup("/blog/"), b"<h1>Blog</h1><div><h1>Blog</h1><ul><li>post</li></ul></div>")
+        self.assertIs(self.site.trees[os.path.join(self.content, "index.md")], trees[os.path.join(self.content, "index.md")])
+
+    def test_partial_change_rebuilds_dependents(self):
+        self.write(os.path.join(self.tmp.name, "nav.html"), "<nav></nav>")
+        self.write(self.template, "{{> nav.html }}<title>{{ Title }}</title>{{ Content }}", 1)
+        self.assertEqual(self.site.refresh(), ["/blog/index.html", "/index.html"])
+        self.assertEqual(self.site.refresh(), [])
+        self.write(os.path.join(self.tmp.name, "nav.html"), "<nav>edited</nav>", 1)
+        self.assertEqual(self.site.refresh(), ["/blog/index.html", "/index.html"])
+        self.assertTrue(self.site.lookup("/").startswith(b"<nav>edited</nav>"))
+
+    def test_deleted_page(self):
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.assertEqual(self.site.refresh(), ["/blog/index.html"])
+        self.assertIsNone(self.site.lookup("/blog/"))
+
+    def test_refresh_reported_paths(self):
+        blog = os.path.join(self.content, "blog", "index.md")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited", 1)
+        self.write(blog, "# Blog\n\nEdited", 1)
+        # Only the reported path is looked at
+        self.assertEqual(self.site.refresh({blog}), ["/blog/index.html"])
+        shutil.rmtree(os.path.join(self.content, "blog"))
+        self.assertEqual(self.site.refresh({os.path.join(self.content, "blog")}), ["/blog/index.html"])
+        self.assertIsNone(self.site.lookup("/blog/"))
+        self.assertEqual(self.site.refresh(), ["/index.html"])
+
+    def test_missing_template_keeps_last_good(self):
+        page = self.site.lookup("/")
+        os.remove(self.template)
+        self.assertEqual(self.site.refresh(), [])
+        self.assertEqual(self.site.lookup("/"), page)
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", 1)
+        self.assertEqual(self.site.refresh(), ["/blog/index.html", "/index.html"])
+
+    def test_missing_partial_retried(self):
+        self.write(self.template, "{{> nav.html }}{{ Content }}", 1)
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.site.refresh(), [])
+        self.write(os.path.join(self.tmp.name, "nav.html"), "<nav></nav>")
+        self.assertEqual(self.site.refresh(), ["/blog/index.html", "/index.html"])
+
+    def test_failed_page_retried_when_changed(self):
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "<no title>", 1)
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.site.refresh(), [])
+        self.assertEqual(self.site.lookup("/"), b"<pre>ValueError: No H1 header found in the markdown content.</pre>")
+        with self.assertNoLogs(level="ERROR"):
+            self.assertEqual(self.site.refresh(), [])
+        self.write(path, "# <Home>", 2)
+        self.assertEqual(self.site.refresh(), ["/index.html"])
+
+    def test_error_page_escaped(self):
+        def parse(md_path, mtime_ns):
+            raise ValueError("<script>")
+        self.site.parse = parse
+        self.write(os.path.join(self.content, "index.md"), "# Home", 1)
+        with self.assertLogs(level="ERROR"):
+            self.site.refresh()
+        self.assertEqual(self.site.lookup("/"), b"<pre>ValueError: &lt;script&gt;</pre>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import tempfile
+from main import *
+from shard import *
+from linkcheck import LinkIndex
+
+
+class TestPartition(unittest.TestCase):
+    def setUp(self):
+        self.entries = [(f"page{i}/index.md", i * 10) for i in range(50)]
+
+    def test_every_entry_in_exactly_one_shard(self):
+        for strategy in SHARD_STRATEGIES:
+            shards = partition(self.entries, 4, strategy)
+            paths = [path for shard in shards for path in shard]
+            self.assertEqual(sorted(paths), sorted(path for path, _ in self.entries))
+            self.assertEqual(partition(list(reversed(self.entries)), 4, strategy), shards)
+
+    def test_hash_is_stable_as_the_site_grows(self):
+        before = partition(self.entries, 4, "hash")
+        after = partition(self.entries + [("new/index.md", 5)], 4, "hash")
+        for old, new in zip(before, after):
+            self.assertTrue(set(old) <= set(new))
+
+    def test_size_balances_bytes(self):
+        sizes = dict(self.entries)
+        loads = [sum(sizes[path] for path in shard) for shard in partition(self.entries, 4, "size")]
+        self.assertLessEqual(max(loads) - min(loads), max(sizes.values()))
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for i in range(12):
+            path = os.path.join(self.content, f"section{i % 3}", f"page{i}.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"# Page {i}\n\n" + "- item\n" * i)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                with open(os.path.join(dirpath, name), "rb") as f:
+                    files[os.path.relpath(os.path.join(dirpath, name), root)] = f.read()
+        return files
+
+    def build_shards(self, count, strategy):
+        shard_dirs = []
+        for i in range(1, count + 1):
+            shard_dir = os.path.join(self.root, f"shard{i}")
+            generate_pages_recursive(self.content, self.template, shard_dir, "/", shard=Shard(i, count, strategy), links=LinkIndex())
+            shard_dirs.append(shard_dir)
+        return shard_dirs
+
+    def test_merged_shards_match_serial_build(self):
+        serial = os.path.join(self.root, "serial")
+        generate_pages_recursive(self.content, self.template, serial, "/")
+        for strategy in SHARD_STRATEGIES:
+            merged = os.path.join(self.root, f"merged-{strategy}")
+            shard_dirs = self.build_shards(3, strategy)
+            pages = collect_pages(self.content, merged)
+            links = LinkIndex()
+            self.assertEqual(merge_shards(shard_dirs, pages, merged, OutputWriter(), links), 12)
+            self.assertEqual(len(links.references), 12)
+            self.assertEqual(self.read_tree(merged), self.read_tree(serial))
+
+    def test_merge_detects_missing_pages(self):
+        shard_dirs = self.build_shards(2, "hash")
+        merged = os.path.join(self.root, "merged")
+        pages = collect_pages(self.content, merged)
+        with self.assertRaises(RuntimeError):
+            merge_shards(shard_dirs[:1], pages, merged, OutputWriter())
+
+        # A page added after the shards were built is reported as missing
+        with open(os.path.join(self.content, "late.md"), "w") as f:
+            f.write("# Late")
+        with self.assertRaisesRegex(RuntimeError, "missing late.html"):
+            merge_shards(shard_dirs, collect_pages(self.content, merged), merged, OutputWriter())
+
+    def test_merge_rejects_different_settings(self):
+        shard_dirs = [os.path.join(self.root, "shard1"), os.path.join(self.root, "shard2")]
+        generate_pages_recursive(self.content, self.template, shard_dirs[0], "/", shard=Shard(1, 2), links=LinkIndex())
+        generate_pages_recursive(self.content, self.template, shard_dirs[1], "/base/", shard=Shard(2, 2), links=LinkIndex())
+        merged = os.path.join(self.root, "merged")
+        with self.assertRaisesRegex(RuntimeError, "different basepath"):
+            merge_shards(shard_dirs, collect_pages(self.content, merged), merged, OutputWriter())
+
+        with open(self.template, "a") as f:
+            f.write("<footer></footer>")
+        generate_pages_recursive(self.content, self.template, shard_dirs[1], "/", shard=Shard(2, 2), links=LinkIndex())
+        with self.assertRaisesRegex(RuntimeError, "different template"):
+            merge_shards(shard_dirs, collect_pages(self.content, merged), merged, OutputWriter())
+
+
+if __name__ == "__main__":
+    unittest.main()
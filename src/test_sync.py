@@ -0,0 +1,67 @@
+import unittest
+import os
+import tempfile
+from sync import *
+from manifest import BuildManifest
+from output import remove_empty_parents
+
+
+class TestSyncDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_copies_only_changed_files(self):
+        self.assertEqual(sync_directory(self.src, self.dst), {"copied": 2, "unchanged": 0})
+        self.assertEqual(sync_directory(self.src, self.dst), {"copied": 0, "unchanged": 2})
+
+        self.write(os.path.join(self.src, "index.css"), "body { margin: 0 }")
+        self.assertEqual(sync_directory(self.src, self.dst), {"copied": 1, "unchanged": 1})
+        with open(os.path.join(self.dst, "index.css")) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+    def test_checksum_ignores_touched_files(self):
+        sync_directory(self.src, self.dst)
+        os.utime(os.path.join(self.src, "index.css"), ns=(0, 0))
+        self.assertEqual(sync_directory(self.src, self.dst, checksum=True), {"copied": 0, "unchanged": 2})
+
+    def test_keeps_generated_html_and_prunes_stale_assets(self):
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        sync_directory(self.src, self.dst, manifest)
+        manifest.save()
+        page = os.path.join(self.dst, "index.html")
+        self.write(page, "<html></html>")
+
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        manifest = BuildManifest(manifest.path)
+        sync_directory(self.src, self.dst, manifest)
+        self.assertEqual(remove_empty_parents(manifest.prune(), self.dst), [os.path.join(self.dst, "images")])
+        self.assertTrue(os.path.exists(page))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+
+    def test_link_modes(self):
+        for link_mode in ("hardlink", "reflink"):
+            dst = os.path.join(self.tmp.name, link_mode)
+            sync_directory(self.src, dst, link_mode=link_mode)
+            with open(os.path.join(dst, "images", "a.png")) as f:
+                self.assertEqual(f.read(), "png")
+            self.assertEqual(sync_directory(self.src, dst, link_mode=link_mode)["copied"], 0)
+        self.assertEqual(
+            os.stat(os.path.join(self.tmp.name, "hardlink", "index.css")).st_ino,
+            os.stat(os.path.join(self.src, "index.css")).st_ino,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import io
+import os
+import tempfile
+from template import *
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>body</p>"}),
+            "<title>Hi</title><main><p>body</p></main>",
+        )
+
+    def test_extra_and_unknown_slots(self):
+        template = Template("{{ Title }} by {{ Author }} {{ Missing }}")
+        self.assertEqual(template.render({"Title": "Post", "Author": "Me"}), "Post by Me {{ Missing }}")
+
+    def test_basepath_matches_str_replace(self):
+        source = '<link href="/index.css" /><article>{{ Content }}</article><img src="/logo.png" />'
+        content = '<a href="/blog">blog</a><img src="/images/tom.png" alt="tom"></img>'
+        expected = source.replace("{{ Content }}", content).replace('href="/', 'href="/base/').replace('src="/', 'src="/base/')
+        template = Template(source, "/base/")
+        self.assertEqual(template.render({"Content": content}), expected)
+        self.assertIn('href="/base/index.css"', template.chunks[0])
+
+    def test_basepath_rewrites_srcset(self):
+        html = '<img src="/a.png" alt="a" srcset="/a-480w.png 480w, https://cdn.example.com/a.png 900w">'
+        self.assertEqual(
+            rewrite_basepath(html, "/base/"),
+            '<img src="/base/a.png" alt="a" srcset="/base/a-480w.png 480w, https://cdn.example.com/a.png 900w">',
+        )
+
+    def test_assets_rewritten_with_basepath(self):
+        assets = {"/a.png": "/a.123.png"}
+        html = '<img src="/a.png#top" srcset="/a.png 900w, /b.png 400w"><a href="/a.png">a</a>'
+        expected = '<img src="/a.123.png#top" srcset="/a.123.png 900w, /b.png 400w"><a href="/a.123.png">a</a>'
+        self.assertEqual(rewrite_basepath(html, "/", assets), expected)
+        self.assertEqual(rewrite_basepath(html, "/base/", assets), expected.replace('="/', '="/base/').replace(", /", ", /base/"))
+
+    def test_stream_iterable_value(self):
+        template = Template("<div>{{ Content }}</div><p>{{ Content }}</p>")
+        fp = io.StringIO()
+        template.stream(fp, {"Content": iter(["a", "b"])})
+        self.assertEqual(fp.getvalue(), "<div>ab</div><p>ab</p>")
+
+    def test_load_template_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(load_template(path).render({"Title": "x"}), "<h1>x</h1>")
+
+    def test_include_partials(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "partials"))
+            path = os.path.join(root, "template.html")
+            nav = os.path.join(root, "partials", "nav.html")
+            footer = os.path.join(root, "partials", "footer.html")
+            with open(path, "w") as f:
+                f.write("{{> partials/nav.html }}{{ Content }}")
+            with open(nav, "w") as f:
+                f.write('<a href="/">{{ Title }}</a>{{> footer.html }}')
+            with open(footer, "w") as f:
+                f.write("<footer></footer>")
+            template = load_template(path, "/base/")
+            self.assertEqual(template.dependencies, [path, nav, footer])
+            self.assertEqual(template.render({"Title": "Home", "Content": "x"}), '<a href="/base/">Home</a><footer></footer>x')
+
+            # Editing a partial invalidates the cached template
+            with open(footer, "w") as f:
+                f.write("<footer>edited</footer>")
+            os.utime(footer, ns=(0, 0))
+            self.assertIn("<footer>edited</footer>", load_template(path, "/base/").render({}))
+
+    def test_include_cycle(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("{{> template.html }}")
+            with self.assertRaises(ValueError):
+                load_template(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
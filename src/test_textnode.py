@@ -61,6 +61,27 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, None)
         self.assertEqual(html_node.props, {"src": "https://www.mysite.com/bear.jpg", "alt": "this is a bear"})
 
+    def test_to_html_matches_leaf_node(self):
+        nodes = [
+            TextNode("plain", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code", TextType.CODE),
+            TextNode("link", TextType.LINK, "https://www.mysite.com"),
+            TextNode("a bear", TextType.IMAGE, "/bear.jpg"),
+        ]
+        for node in nodes:
+            self.assertEqual(node.to_html(), node.text_node_to_html_node().to_html())
+
+    def test_to_html_missing_text(self):
+        with self.assertRaises(ValueError):
+            TextNode(None, TextType.LINK, "https://www.mysite.com").to_html()
+
+    def test_slots(self):
+        self.assertFalse(hasattr(TextNode("x", TextType.TEXT), "__dict__"))
+        self.assertFalse(hasattr(LeafNode("b", "x"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
 
 
 if __name__ == "__main__":
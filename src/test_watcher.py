@@ -0,0 +1,51 @@
+import unittest
+import os
+import shutil
+import tempfile
+from watcher import *
+
+
+@unittest.skipUnless(INOTIFY_SUPPORTED, "inotify is not available")
+class TestInotifyWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "blog"))
+        self.watcher = InotifyWatcher(self.root)
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp.cleanup()
+
+    def write(self, *parts):
+        path = os.path.join(self.root, *parts)
+        with open(path, "w") as f:
+            f.write("# Title")
+        return path
+
+    def test_idle(self):
+        self.assertEqual(self.watcher.wait(0), set())
+
+    def test_written_and_removed_files(self):
+        path = self.write("blog", "index.md")
+        self.assertEqual(self.watcher.wait(1), {path})
+        os.remove(path)
+        self.assertEqual(self.watcher.wait(1), {path})
+
+    def test_new_directory_watched(self):
+        directory = os.path.join(self.root, "new")
+        os.makedirs(directory)
+        path = self.write("new", "index.md")
+        self.assertIn(path, self.watcher.wait(1))
+        self.write("new", "index.md")
+        self.assertEqual(self.watcher.wait(1), {path})
+
+    def test_moved_directory_rescans(self):
+        shutil.move(os.path.join(self.root, "blog"), os.path.join(self.root, "posts"))
+        self.assertIsNone(self.watcher.wait(1))
+        path = self.write("posts", "index.md")
+        self.assertEqual(self.watcher.wait(1), {path})
+
+
+if __name__ == "__main__":
+    unittest.main()
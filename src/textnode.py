@@ -9,7 +9,12 @@ class TextType(Enum):
     LINK = "link"
     IMAGE = "image"
 
+# HTML tags of the inline types that render as a plain wrapped value
+_SIMPLE_TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i", TextType.CODE: "code"}
+
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -39,6 +44,32 @@ class TextNode():
                 return LeafNode("img", "", {"src": self.url, "alt": self.text})
             case _:
                 raise Exception("texttype not valid for conversion to html")
+
+    def _render(self, out):
+        """
+        Writes the same HTML as text_node_to_html_node().to_html() without allocating the LeafNode,
+        so text nodes can be used directly as children of a ParentNode.
+        """
+        text_type = self.text_type
+        if text_type is TextType.IMAGE:
+            out.append(f"<img src=\"{self.url}\" alt=\"{self.text}\"></img>")
+            return
+        if self.text is None:
+            raise ValueError("value cannot be blank for a leaf node")
+        if text_type is TextType.TEXT:
+            out.append(self.text)
+        elif text_type in _SIMPLE_TAGS:
+            tag = _SIMPLE_TAGS[text_type]
+            out.append(f"<{tag}>{self.text}</{tag}>")
+        elif text_type is TextType.LINK:
+            out.append(f"<a href=\"{self.url}\">{self.text}</a>")
+        else:
+            raise Exception("texttype not valid for conversion to html")
+
+    def to_html(self):
+        out = []
+        self._render(out)
+        return "".join(out)
             
 
             
@@ -0,0 +1,138 @@
+import os
+import sys
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+
+# inotify event flags, from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+# Files are reported once they are written and closed, not on every write
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# struct inotify_event: wd, mask, cookie, len, then len bytes of NUL-padded name
+_EVENT = struct.Struct("iIII")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+INOTIFY_SUPPORTED = _libc is not None
+
+
+class InotifyWatcher:
+    """
+    Watches a directory tree with Linux inotify, so the paths that changed are known without
+    scanning the whole tree. Directories created later are watched as they appear.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.fd = None
+        # Watch descriptor -> directory path
+        self.directories = {}
+        self._start()
+
+    def _start(self):
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.directories = {}
+        self._watch_tree(self.root)
+
+    def _watch_tree(self, root: str) -> set:
+        # Watches every directory under root and returns the files already in them
+        files = set()
+        for dir_path, _, file_names in os.walk(root):
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOENT:
+                    continue  # Removed while walking; its parent reports that
+                raise OSError(error, f"Cannot watch {dir_path}: {os.strerror(error)}")
+            self.directories[wd] = dir_path
+            files.update(os.path.join(dir_path, file_name) for file_name in file_names)
+        return files
+
+    def wait(self, timeout: float):
+        """
+        Waits up to timeout seconds for changes and returns the set of paths created, written
+        or removed (with the files of new directories), empty if nothing changed. Returns None
+        when events were lost or a directory was moved away; the caller has to rescan the tree.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.directories.pop(wd, None)
+                    continue
+                directory = self.directories.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._watch_tree(path))
+                elif mask & IN_ISDIR and mask & IN_MOVED_FROM:
+                    # The moved directory's watches still carry its old path
+                    rescan = True
+                changed.add(path)
+        if rescan:
+            logging.debug(f"Lost track of {self.root}, watching it again")
+            self.close()
+            self._start()
+            return None
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def watch_tree(root: str):
+    """
+    Returns an InotifyWatcher for root, or None where inotify is unavailable so the caller
+    falls back to scanning.
+    """
+    if not INOTIFY_SUPPORTED:
+        return None
+    try:
+        return InotifyWatcher(root)
+    except OSError as e:
+        logging.warning(f"Cannot watch {root} with inotify, scanning instead: {e}")
+        return None